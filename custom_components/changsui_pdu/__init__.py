@@ -1,13 +1,14 @@
 """Changsui PDU 组件主入口 - 优化版本"""
+import asyncio
 import logging
 from datetime import timedelta
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.const import Platform
 
-from .pdu_client import PDUClient
+from .pdu_client import PDUClient, PDUUnavailableError
 from .energy_tracker import EnergyTracker
 
 _LOGGER = logging.getLogger(__name__)
@@ -15,6 +16,37 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "changsui_pdu"
 PLATFORMS = [Platform.SWITCH, Platform.SENSOR]
 
+# 能耗数据轮询间隔: 实时轮询间隔的倍数，且不低于下限(秒)
+ENERGY_SCAN_MULTIPLIER = 10
+ENERGY_SCAN_INTERVAL_MIN = 300
+
+
+async def _async_gather_data(coordinator: DataUpdateCoordinator, requests: dict) -> dict:
+    """并发请求各 CGI 接口，单个接口失败时沿用协调器上一次的数据
+
+    PDU 整体不可达(熔断或登录失败)时直接抛出，不用旧数据冒充成功的更新。
+
+    Args:
+        coordinator: 数据所属的协调器
+        requests: {数据键: 待执行的请求协程}
+
+    Returns:
+        {数据键: 请求结果}
+    """
+    results = await asyncio.gather(*requests.values(), return_exceptions=True)
+    for result in results:
+        if isinstance(result, PDUUnavailableError):
+            raise result
+
+    last_data = coordinator.data or {}
+    data = {}
+    for key, result in zip(requests, results):
+        if isinstance(result, Exception):
+            _LOGGER.warning("获取 %s 数据失败: %s", key, result)
+            result = last_data.get(key, [] if key == "outlet_energy" else {})
+        data[key] = result
+    return data
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """设置 Changsui PDU 集成"""
@@ -34,33 +66,66 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("登录 PDU 失败: %s", e)
         return False
 
-    # 数据更新方法
+    # 初始化能耗追踪器（如果启用）
+    show_outlet_energy = entry.data.get("show_outlet_energy", False)
+    energy_tracker = None
+    load_task = None
+    if show_outlet_energy:
+        energy_tracker = EnergyTracker(hass, entry.entry_id)
+        # 与实时数据的首次刷新并行加载历史数据，能耗首次刷新前等待加载完成
+        load_task = hass.async_create_task(energy_tracker.async_load())
+        _LOGGER.info("能耗追踪器已初始化")
+
+    async def _no_outlet_energy():
+        return []
+
+    # 实时数据更新方法(电参、插座状态)
     async def async_update_data():
-        """更新 PDU 数据"""
+        """更新 PDU 实时数据"""
         try:
-            overview = await client.get_pdu_overview()
-            outlets_data = await client.get_outlet_status()
-            daily_data = await client.get_daily_energy()
-            
-            # 如果启用了能耗统计，获取插座能耗数据
-            outlet_energy_data = []
-            if entry.data.get("show_outlet_energy", False):
-                outlet_energy_data = await client.get_outlet_energy()
-                # 更新能耗追踪器
-                if "energy_tracker" in hass.data[DOMAIN].get(entry.entry_id, {}):
-                    tracker = hass.data[DOMAIN][entry.entry_id]["energy_tracker"]
-                    await tracker.update(outlet_energy_data)
-            
-            return {
-                "overview": overview,
-                "outlets": outlets_data,
-                "daily": daily_data,
-                "outlet_energy": outlet_energy_data,
-            }
+            # 先统一确保登录，避免并发请求各自触发重复登录
+            await client.ensure_logged_in()
+            return await _async_gather_data(
+                coordinator,
+                {
+                    "overview": client.get_pdu_overview(),
+                    "outlets": client.get_outlet_status(),
+                },
+            )
+        except PDUUnavailableError as e:
+            raise UpdateFailed(str(e)) from e
         except Exception as e:
             _LOGGER.error("更新 PDU 数据失败: %s", e)
             raise
 
+    # 能耗数据更新方法(能耗计数变化较慢，低频轮询)
+    async def async_update_energy_data():
+        """更新 PDU 能耗数据"""
+        try:
+            await client.ensure_logged_in()
+            data = await _async_gather_data(
+                energy_coordinator,
+                {
+                    "daily": client.get_daily_energy(),
+                    "outlet_energy": (
+                        client.get_outlet_energy()
+                        if show_outlet_energy
+                        else _no_outlet_energy()
+                    ),
+                },
+            )
+
+            # 如果启用了能耗统计，更新能耗追踪器
+            if energy_tracker:
+                await energy_tracker.update(data["outlet_energy"])
+
+            return data
+        except PDUUnavailableError as e:
+            raise UpdateFailed(str(e)) from e
+        except Exception as e:
+            _LOGGER.error("更新 PDU 能耗数据失败: %s", e)
+            raise
+
     # 获取轮询间隔，默认为 30 秒
     scan_interval = entry.data.get("scan_interval", 30)
 
@@ -72,21 +137,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         update_method=async_update_data,
         update_interval=timedelta(seconds=scan_interval),
     )
+    energy_coordinator = DataUpdateCoordinator(
+        hass,
+        _LOGGER,
+        name=f"changsui_pdu_{host}_energy",
+        update_method=async_update_energy_data,
+        update_interval=timedelta(
+            seconds=max(scan_interval * ENERGY_SCAN_MULTIPLIER, ENERGY_SCAN_INTERVAL_MIN)
+        ),
+    )
 
     # 首次刷新
-    await coordinator.async_config_entry_first_refresh()
-
-    # 初始化能耗追踪器（如果启用）
-    energy_tracker = None
-    if entry.data.get("show_outlet_energy", False):
-        energy_tracker = EnergyTracker(hass, entry.entry_id)
-        await energy_tracker.async_load()
-        _LOGGER.info("能耗追踪器已初始化")
+    try:
+        await coordinator.async_config_entry_first_refresh()
+        if load_task is not None:
+            await load_task
+        await energy_coordinator.async_config_entry_first_refresh()
+    finally:
+        # 首次刷新失败(集成未加载)时不再保留后台加载任务
+        if load_task is not None and not load_task.done():
+            load_task.cancel()
 
     # 存储数据
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
         "coordinator": coordinator,
+        "energy_coordinator": energy_coordinator,
         "outlets": outlets,
         "energy_tracker": energy_tracker,
     }
@@ -116,5 +192,4 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """重新加载集成"""
     _LOGGER.info("重新加载 Changsui PDU 集成: %s", entry.entry_id)
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -12,6 +12,7 @@ async def async_get_config_entry_diagnostics(
     data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
+    energy_coordinator = data["energy_coordinator"]
 
     return {
         "entry": {
@@ -39,15 +40,15 @@ async def async_get_config_entry_diagnostics(
                 else None
             ),
             "update_interval_seconds": coordinator.update_interval.total_seconds(),
+            "energy_last_update_success": energy_coordinator.last_update_success,
+            "energy_update_interval_seconds": (
+                energy_coordinator.update_interval.total_seconds()
+            ),
         },
         "data": {
-            "outlets_count": len(coordinator.data.get("outlets", [])),
+            "outlets_count": len(coordinator.data.get("outlets", {}).get("names", [])),
             "has_overview": "overview" in coordinator.data,
-            "has_daily": "daily" in coordinator.data,
-            "overview_keys": (
-                list(coordinator.data["overview"].keys())
-                if "overview" in coordinator.data
-                else []
-            ),
+            "has_daily": "daily" in (energy_coordinator.data or {}),
+            "overview_keys": list(client._overview_keys),
         },
     }
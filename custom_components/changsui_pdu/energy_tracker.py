@@ -1,80 +1,192 @@
 """能耗追踪器 - 处理插座能耗历史数据"""
 import logging
-from datetime import datetime, timedelta
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
 from typing import Dict, Optional
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.storage import Store
 
 _LOGGER = logging.getLogger(__name__)
 
 STORAGE_VERSION = 1
 STORAGE_KEY = "changsui_pdu_energy"
+SAVE_DELAY = 30  # 延迟写盘秒数，合并短时间内的多次保存
+TODAY_CACHE_SECONDS = 60  # 当前日期字符串的缓存时长
+SNAPSHOT_RETENTION_DAYS = 60  # 逐日快照保留天数，更早的数据汇总为月度值
 
 
 class EnergyTracker:
     """能耗追踪器，负责存储和计算插座能耗数据"""
 
-    def __init__(self, hass: HomeAssistant, entry_id: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        retention_days: int = SNAPSHOT_RETENTION_DAYS,
+    ):
         """初始化能耗追踪器
         
         Args:
             hass: Home Assistant 实例
             entry_id: 配置条目 ID
+            retention_days: 逐日快照保留天数
         """
         self.hass = hass
         self.entry_id = entry_id
+        self.retention_days = retention_days
+        # 不传自定义 encoder: Store 默认即使用 orjson 序列化/反序列化，
+        # 传入 JSONEncoder 反而会退回标准库 json 的慢路径
         self._store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}_{entry_id}")
         self._data: Dict = {}
+        self._loaded = False
         self._last_midnight_check = None
+        # 当前日期字符串，每次更新时刷新，读取时最多缓存 TODAY_CACHE_SECONDS 秒
+        self._today_iso: Optional[str] = None
+        self._today_checked_at = 0.0
 
     async def async_load(self):
         """加载存储的能耗数据"""
         data = await self._store.async_load()
         if data:
             self._data = data
+            self._data["snapshots"] = self._migrate_snapshots(data.get("snapshots", {}))
             _LOGGER.debug("加载能耗数据: %s", self._data)
         else:
             self._data = {
-                "snapshots": {},  # {outlet_id: {date: energy_value}}
+                # 列式快照: dates 升序，values 中每个列表与 dates 按下标对齐
+                "snapshots": {"dates": [], "values": {}},
                 "today_start": {},  # {outlet_id: energy_value}
                 "yesterday_start": {},  # {outlet_id: energy_value}
                 "yesterday_end": {},  # {outlet_id: energy_value}
             }
+        # 月度汇总: {outlet_id: {YYYY-MM: 当月最后一个快照值}}
+        self._data.setdefault("monthly", {})
+        self._loaded = True
 
-    async def async_save(self):
-        """保存能耗数据"""
-        await self._store.async_save(self._data)
+    @staticmethod
+    def _migrate_snapshots(snapshots: Dict) -> Dict:
+        """将旧格式快照 {outlet_id: {date: energy}} 转换为列式格式"""
+        if "dates" in snapshots:
+            return snapshots
+
+        dates = sorted({day for per_outlet in snapshots.values() for day in per_outlet})
+        values = {
+            outlet_id: [per_outlet.get(day) for day in dates]
+            for outlet_id, per_outlet in snapshots.items()
+        }
+        return {"dates": dates, "values": values}
+
+    def _today(self) -> str:
+        """返回当前日期字符串，短时间内复用缓存值"""
+        now = time.monotonic()
+        if self._today_iso is None or now - self._today_checked_at > TODAY_CACHE_SECONDS:
+            self._today_iso = date.today().isoformat()
+            self._today_checked_at = now
+        return self._today_iso
+
+    def _date_index(self, day: str) -> Optional[int]:
+        """返回日期在快照中的下标，不存在时返回 None"""
+        dates = self._data["snapshots"]["dates"]
+        pos = bisect_left(dates, day)
+        if pos < len(dates) and dates[pos] == day:
+            return pos
+        return None
+
+    def _ensure_date(self, day: str) -> int:
+        """确保快照中存在该日期列，返回其下标"""
+        snapshots = self._data["snapshots"]
+        dates = snapshots["dates"]
+        # 常见情况: 日期就是最后一列或是新的一天
+        if dates and dates[-1] == day:
+            return len(dates) - 1
+        pos = bisect_left(dates, day)
+        if pos < len(dates) and dates[pos] == day:
+            return pos
+        dates.insert(pos, day)
+        for column in snapshots["values"].values():
+            column.insert(pos, None)
+        return pos
+
+    def _snapshot(self, outlet_id: str, day: str) -> Optional[float]:
+        """获取指定插座指定日期的快照值"""
+        column = self._data["snapshots"]["values"].get(outlet_id)
+        if column is None:
+            return None
+        dates = self._data["snapshots"]["dates"]
+        if dates and dates[-1] == day:
+            return column[-1]
+        pos = self._date_index(day)
+        return column[pos] if pos is not None else None
+
+    def _prune_snapshots(self, current_date) -> bool:
+        """将超出保留期的逐日快照汇总为月度值并删除
+
+        Returns:
+            是否有数据被清理
+        """
+        snapshots = self._data["snapshots"]
+        dates = snapshots["dates"]
+        cutoff = (current_date - timedelta(days=self.retention_days)).isoformat()
+        pos = bisect_left(dates, cutoff)
+        if pos == 0:
+            return False
+
+        monthly = self._data["monthly"]
+        for outlet_id, column in snapshots["values"].items():
+            outlet_monthly = monthly.setdefault(outlet_id, {})
+            # 日期升序，同月后出现的值覆盖先出现的，即保留当月最后一个快照
+            for day, value in zip(dates[:pos], column[:pos]):
+                if value is not None:
+                    outlet_monthly[day[:7]] = value
+            del column[:pos]
+        del dates[:pos]
+        _LOGGER.debug("已将 %d 天前的能耗快照汇总为月度数据", self.retention_days)
+        return True
+
+    @callback
+    def async_schedule_save(self):
+        """延迟保存能耗数据，短时间内的多次保存合并为一次写盘"""
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
 
     async def update(self, outlet_energies: list):
         """更新能耗数据并检查是否需要保存快照
         
         Args:
-            outlet_energies: 插座能耗列表 [{"name": "Outlet1", "energy": 6.08}, ...]
+            outlet_energies: 插座能耗列表 [OutletEnergyRow("Outlet1", 6.08), ...]
         """
+        if not self._loaded:
+            return
+
         now = datetime.now()
-        today = now.date().isoformat()
         
         # 检查是否跨越了午夜
         await self._check_midnight(now)
+        today_pos = self._ensure_date(self._today_iso)
+        values = self._data["snapshots"]["values"]
+        num_dates = len(self._data["snapshots"]["dates"])
         
         # 更新每个插座的数据
         for idx, outlet in enumerate(outlet_energies, start=1):
             outlet_id = f"outlet_{idx}"
-            energy = outlet.get("energy", 0)
+            energy = outlet.energy
             
             # 如果是今天第一次更新，记录今日起始值
             if outlet_id not in self._data["today_start"]:
                 self._data["today_start"][outlet_id] = energy
-                _LOGGER.debug(f"记录 {outlet_id} 今日起始能耗: {energy} kWh")
+                _LOGGER.debug("记录 %s 今日起始能耗: %s kWh", outlet_id, energy)
             
             # 保存快照
-            if outlet_id not in self._data["snapshots"]:
-                self._data["snapshots"][outlet_id] = {}
-            self._data["snapshots"][outlet_id][today] = energy
+            column = values.get(outlet_id)
+            if column is None:
+                column = values[outlet_id] = [None] * num_dates
+            column[today_pos] = energy
 
     async def _check_midnight(self, now: datetime):
         """检查是否跨越午夜，如果是则保存昨日数据"""
         current_date = now.date()
+        self._today_iso = current_date.isoformat()
+        self._today_checked_at = time.monotonic()
         
         # 如果是首次检查或日期发生变化
         if self._last_midnight_check is None or self._last_midnight_check != current_date:
@@ -87,18 +199,26 @@ class EnergyTracker:
                 
                 # 获取昨日起始值（如果有的话）
                 yesterday = (current_date - timedelta(days=1)).isoformat()
-                for outlet_id in self._data["snapshots"]:
-                    if yesterday in self._data["snapshots"][outlet_id]:
-                        if "yesterday_start" not in self._data:
-                            self._data["yesterday_start"] = {}
-                        # 查找昨日最早的快照作为起始值
-                        self._data["yesterday_start"][outlet_id] = self._data["snapshots"][outlet_id][yesterday]
+                yesterday_pos = self._date_index(yesterday)
+                if yesterday_pos is not None:
+                    for outlet_id, column in self._data["snapshots"]["values"].items():
+                        if column[yesterday_pos] is not None:
+                            if "yesterday_start" not in self._data:
+                                self._data["yesterday_start"] = {}
+                            # 查找昨日最早的快照作为起始值
+                            self._data["yesterday_start"][outlet_id] = column[yesterday_pos]
                 
                 # 清空今日起始值，等待新的一天的第一次更新
                 self._data["today_start"] = {}
                 
+                # 清理过期快照
+                self._prune_snapshots(current_date)
+                
                 # 保存数据
-                await self.async_save()
+                self.async_schedule_save()
+            elif self._prune_snapshots(current_date):
+                # 首次检查时清理加载进来的过期快照
+                self.async_schedule_save()
             
             self._last_midnight_check = current_date
 
@@ -111,16 +231,17 @@ class EnergyTracker:
         Returns:
             今日用电量 (kWh)，如果数据不足则返回 None
         """
+        if not self._loaded:
+            return None
+
         outlet_id = f"outlet_{outlet_idx}"
-        today = datetime.now().date().isoformat()
         
         # 获取今日起始值
         today_start = self._data["today_start"].get(outlet_id)
         
         # 获取当前值（最新快照）
-        if outlet_id in self._data["snapshots"] and today in self._data["snapshots"][outlet_id]:
-            current = self._data["snapshots"][outlet_id][today]
-            
+        current = self._snapshot(outlet_id, self._today())
+        if current is not None:
             if today_start is not None:
                 usage = current - today_start
                 return max(0, usage)  # 确保不为负数
@@ -136,6 +257,9 @@ class EnergyTracker:
         Returns:
             昨日用电量 (kWh)，如果数据不足则返回 None
         """
+        if not self._loaded:
+            return None
+
         outlet_id = f"outlet_{outlet_idx}"
         
         yesterday_start = self._data.get("yesterday_start", {}).get(outlet_id)
@@ -156,10 +280,8 @@ class EnergyTracker:
         Returns:
             总能耗 (kWh)，如果数据不足则返回 None
         """
+        if not self._loaded:
+            return None
+
         outlet_id = f"outlet_{outlet_idx}"
-        today = datetime.now().date().isoformat()
-        
-        if outlet_id in self._data["snapshots"] and today in self._data["snapshots"][outlet_id]:
-            return self._data["snapshots"][outlet_id][today]
-        
-        return None
+        return self._snapshot(outlet_id, self._today())
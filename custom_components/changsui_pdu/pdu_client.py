@@ -2,11 +2,96 @@
 import logging
 import aiohttp
 import asyncio
+import random
+import time
+from array import array
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 _LOGGER = logging.getLogger(__name__)
 
+# CGI 数值字段形如 "1234d"，用 bytes.translate 一次性删除后缀和空白(C 层单次遍历)，
+# 比正则匹配或链式 replace/strip 更快
+_VALUE_STRIP = b"d \t\r\n\x00"
+
+# 请求失败后的默认重试次数
+REQUEST_RETRIES = 1
+
+# 指数退避参数: 基准(秒)、上限(秒)、抖动比例
+# 多台 PDU 同时掉线时，抖动使各客户端的重连错开，避免同一时刻集中冲击网络
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+BACKOFF_JITTER = 0.5
+
+# 熔断: 连续网络失败达到阈值后，在冷却期内直接失败不再访问设备
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN_MAX = 300
+
+# 登录会话有效期(秒)，与设备端 Cookie 生命周期一致；期内不再重复登录
+LOGIN_TTL = 1800
+
+# 登录页特征: 表单提交到 login.cgi，密码字段名为 psd(与登录请求参数一致)
+_LOGIN_PAGE_MARKERS = (b"login.cgi", b'name="psd"', b"name='psd'")
+
+# outlet.cgi 响应中每个插座占用的行数
+OUTLET_LINES = 11
+
+# 插座数据按列存储: 每个字段一个数组，下标为插座编号 - 1
+OUTLET_FIELDS = ("state", "current", "power", "current_min", "current_max")
+
+
+class PDUUnavailableError(Exception):
+    """PDU 暂不可达(熔断冷却中或登录失败)"""
+
+
+class DailyEnergyRow(NamedTuple):
+    """单个插座的当日能耗 (kWh)"""
+
+    name: str
+    start: float
+    end: float
+    today: float
+
+
+class OutletEnergyRow(NamedTuple):
+    """单个插座的累计能耗 (kWh)"""
+
+    name: str
+    energy: float
+
+
+def _backoff_delay(attempt: int) -> float:
+    """计算第 attempt 次失败后的退避等待时间(带随机抖动)
+
+    Args:
+        attempt: 已失败次数 - 1 (从 0 开始)
+
+    Returns:
+        等待秒数
+    """
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return delay * (1 + random.uniform(-BACKOFF_JITTER, BACKOFF_JITTER))
+
+
+def outlet_view(outlets: Dict[str, Any], idx: int) -> Optional[Dict[str, Any]]:
+    """取出单个插座的数据视图
+
+    Args:
+        outlets: get_outlet_status 返回的列式数据
+        idx: 插座编号 (1-based)
+
+    Returns:
+        插座数据字典，插座不存在时返回 None
+    """
+    names = outlets.get("names", ())
+    if not 0 < idx <= len(names):
+        return None
+    view = {"name": names[idx - 1]}
+    for field in OUTLET_FIELDS:
+        view[field] = outlets[field][idx - 1]
+    return view
+
+
 class PDUClient:
     """PDU HTTP 客户端,支持会话管理和错误恢复"""
 
@@ -25,222 +110,405 @@ class PDUClient:
         self.outlets = outlets
         self.session: Optional[aiohttp.ClientSession] = None
         self._logged_in = False
+        # 登录有效期截止时间 (monotonic)
+        self._login_expiry = 0.0
+        # 连续网络失败次数，以及熔断截止时间 (monotonic)
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+
+        # 预先构建登录信息与各接口 URL，轮询和重连时直接复用
+        base_url = f"http://{host}/"
+        self._login_url = f"{base_url}login.cgi?login=1&name={username}&psd={password}"
+        self._cookies = {
+            "usrname": username,
+            "password": password,
+            "lg": "0",
+            "inst": "0",
+            "outlet_index": str(outlets), # Use instance outlet count
+        }
+        self._outlet_url = f"{base_url}outlet.cgi?pdu_index=0"
+        # outlet.cgi 布局只取决于插座数量，预先算好每个插座数据的起始行
+        self._outlet_data_start = 3 if outlets == 20 else 4
+        self._outlet_bases = tuple(
+            self._outlet_data_start + i * OUTLET_LINES for i in range(outlets)
+        )
+        self._outlet_control_url = f"{base_url}outlet.cgi"
+        self._overview_url = f"{base_url}pm.cgi?pdu_index=0"
+        self._daily_url = f"{base_url}energy.cgi?pdu_index=0"
+        self._outlet_energy_url = f"{base_url}outenergy.cgi?pdu_index=0"
+        self._control_headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Referer": f"{base_url}outlet.html",
+        }
+        # 最近一次总览数据包含的字段，供诊断信息使用
+        self._overview_keys: tuple = ()
+        # 当日能耗请求 URL 缓存: ((年, 月, 日), URL)，只在跨天时重建
+        self._daily_url_cache: Optional[Tuple[Tuple[int, int, int], str]] = None
+        # 进行中的请求: {接口标识: Task}，用于合并并发调用
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _parse_int(raw_value: bytes) -> Optional[int]:
+        """解析带 'd' 后缀的整数，格式不符时返回 None"""
+        try:
+            return int(raw_value.translate(None, _VALUE_STRIP))
+        except (ValueError, TypeError, AttributeError):
+            return None
 
-    def _parse_value(self, raw_value: str, scale: float = 1.0) -> float:
+    def _parse_value(self, raw_value: bytes, scale: float = 1.0) -> float:
         """解析带 'd' 后缀的数值并缩放"""
-        try:
-            val = int(raw_value.replace("d", "").strip())
-            return val / scale
-        except (ValueError, AttributeError):
+        val = self._parse_int(raw_value)
+        if val is None:
             return 0.0
+        return val / scale
+
+    @staticmethod
+    def _decode_name(raw_name: bytes) -> str:
+        """解码名称字段(响应中唯一需要转成文本的部分)"""
+        try:
+            return raw_name.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            return raw_name.decode("gb18030", errors="replace").strip()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享会话，不存在或已关闭时创建
+
+        会话在整个客户端生命周期内复用(长连接与 Cookie 一并保留)，
+        仅在 close() 后才会重新创建。
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=4,
+                    limit_per_host=4,
+                    keepalive_timeout=75,
+                    enable_cleanup_closed=True,
+                ),
+                # HTTP/1.1 默认即为长连接，无需额外的 Connection 头
+                # 连接与读取分开计时: 设备不可达时 3 秒即失败，尽快进入重试
+                timeout=aiohttp.ClientTimeout(
+                    total=10, connect=3, sock_connect=3, sock_read=7
+                ),
+            )
+            self._invalidate_login()
+        return self.session
+
+    def _invalidate_login(self) -> None:
+        """标记登录失效，下次请求前重新登录"""
+        self._logged_in = False
+        self._login_expiry = 0.0
+
+    def _record_success(self) -> None:
+        """记录一次成功响应，关闭熔断"""
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+
+    def _record_failure(self) -> None:
+        """记录一次网络失败，连续失败达到阈值时打开熔断"""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            cooldown = min(CIRCUIT_COOLDOWN_MAX, 2 ** self._consecutive_failures)
+            self._circuit_open_until = time.monotonic() + cooldown
+            _LOGGER.warning(
+                "PDU %s 连续 %d 次请求失败，%d 秒内暂停访问",
+                self.host,
+                self._consecutive_failures,
+                cooldown,
+            )
+
+    @staticmethod
+    def _is_login_page(raw: bytes) -> bool:
+        """判断响应是否为登录页(会话已被设备端注销)
+
+        CGI 数据响应是纯文本数据行，登录页则是 HTML 文档。只检查 login 字样
+        会误判插座名称中含 login 的正常响应，因此要求响应为 HTML 且包含
+        登录表单的提交地址或密码字段。
+        """
+        if raw[:512].lstrip()[:1] != b"<":
+            return False
+        body = raw.lower()
+        return any(marker in body for marker in _LOGIN_PAGE_MARKERS)
 
     async def ensure_logged_in(self):
-        """确保已登录,如果未登录则自动登录"""
-        if not self._logged_in or not self.session:
-            await self.login()
+        """确保已登录,如果未登录或登录已过期则自动登录
+
+        熔断期间直接抛出 PDUUnavailableError，不访问设备。
+        """
+        remaining = self._circuit_open_until - time.monotonic()
+        if remaining > 0:
+            raise PDUUnavailableError(f"PDU {self.host} 暂不可达，{remaining:.0f} 秒后重试")
+        if (
+            self._logged_in
+            and time.monotonic() < self._login_expiry
+            and self.session is not None
+            and not self.session.closed
+        ):
+            return
+        await self.login()
 
     async def login(self):
         """登录 PDU,带重试机制"""
         for attempt in range(3):
             try:
-                # 关闭旧会话
-                if self.session:
-                    await self.session.close()
-
-                # 创建新会话
-                self.session = aiohttp.ClientSession(
-                    connector=aiohttp.TCPConnector(force_close=True),
-                    timeout=aiohttp.ClientTimeout(total=10),
-                )
-
-                login_url = (
-                    f"http://{self.host}/login.cgi?"
-                    f"login=1&name={self.username}&psd={self.password}"
-                )
-
-                async with self.session.get(login_url) as resp:
+                # 复用共享会话，重新登录只刷新 Cookie，不重建连接
+                session = self._get_session()
+                async with session.get(self._login_url) as resp:
                     if resp.status == 200:
                         # 注入 Cookie
-                        self.session.cookie_jar.update_cookies(
-                            {
-                                "usrname": self.username,
-                                "password": self.password,
-                                "lg": "0",
-                                "inst": "0",
-                                "outlet_index": str(self.outlets), # Use instance outlet count
-                            }
-                        )
+                        session.cookie_jar.update_cookies(self._cookies)
                         self._logged_in = True
+                        self._login_expiry = time.monotonic() + LOGIN_TTL
+                        self._record_success()
                         _LOGGER.info("成功登录到 PDU %s", self.host)
+                        # 设备不支持长连接时 aiohttp 会自动放弃复用，这里只做提示
+                        if (
+                            _LOGGER.isEnabledFor(logging.DEBUG)
+                            and resp.headers.get("Connection", "").lower() == "close"
+                        ):
+                            _LOGGER.debug("PDU %s 不支持长连接，每次请求将重新建立连接", self.host)
                         return True
-                    else:
+                    elif _LOGGER.isEnabledFor(logging.DEBUG):
                         text = await resp.text()
-                        _LOGGER.debug(f"[Login] Failed status={resp.status} body={text[:100]}")
+                        _LOGGER.debug("[Login] Failed status=%s body=%s", resp.status, text[:100])
 
             except Exception as e:
                 _LOGGER.warning("登录尝试 %d 失败: %s", attempt + 1, e)
-                await asyncio.sleep(2**attempt)  # 指数退避
+                self._record_failure()
+                await asyncio.sleep(_backoff_delay(attempt))  # 指数退避
 
-        raise Exception(f"登录 PDU {self.host} 失败,已尝试 3 次")
+        raise PDUUnavailableError(f"登录 PDU {self.host} 失败,已尝试 3 次")
 
     async def close(self):
         """关闭会话"""
         if self.session:
             await self.session.close()
             self.session = None
-        self._logged_in = False
+        self._invalidate_login()
 
-    async def get_outlet_status(self) -> List[Dict[str, Any]]:
-        """获取插座状态"""
-        await self.ensure_logged_in()
+    def _forget_inflight(self, key: str, task: asyncio.Future) -> None:
+        """请求结束后移除登记(已被新请求替换时保留新请求)"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
 
-        try:
-            url = f"http://{self.host}/outlet.cgi?pdu_index=0"
-            async with self.session.get(url) as resp:
-                if resp.status != 200:
-                    _LOGGER.error("获取插座状态失败: HTTP %s", resp.status)
-                    return []
-
-                text = await resp.text()
-                lines = text.strip().split("\n")
-                
-                # 根据插座数量确定数据起始行
-                data_start_line = 3 if self.outlets == 20 else 4
-                
-                # 提取插座数据
-                data_lines = lines[data_start_line:-1]
-                # 每个插座占11行
-                chunk_size = 11
-                if len(data_lines) % chunk_size != 0:
-                     # 尝试容错: 也许只有 10 行？或者根据 outlets 数量反推
-                     _LOGGER.debug(f"数据行数 {len(lines)} 可能不匹配预期")
-
-                chunks = [data_lines[i : i + chunk_size] for i in range(0, len(data_lines), chunk_size)]
-                
-                outlet_data = []
-                for chunk in chunks:
-                    if len(chunk) < 4: continue
-                    try:
-                        name = chunk[0]
-                        state = 1 - int(chunk[1].replace("d", ""))
-                        current = self._parse_value(chunk[2], 100.0)
-                        power = self._parse_value(chunk[3], 1.0) # Power is raw watts?
-                        
-                        # 尝试解析负载限制(可选)
-                        current_min = None
-                        current_max = None
-                        if len(chunk) > 5:
-                            current_min = self._parse_value(chunk[4], 100.0)
-                            current_max = self._parse_value(chunk[5], 100.0)
-                        
-                        outlet_data.append(
-                            {
-                                "name": name,
-                                "state": state,
-                                "current": current,
-                                "power": power,
-                                "current_min": current_min,
-                                "current_max": current_max,
-                            }
-                        )
-                    except (ValueError, IndexError) as e:
-                        _LOGGER.warning("解析插座数据失败: %s", e)
-                        continue
-
-                return outlet_data
-
-        except aiohttp.ClientError as e:
-            _LOGGER.error("网络错误: %s", e)
-            self._logged_in = False
-            return []
+    async def _coalesced(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """合并同一接口的并发请求
+
+        已有同名请求在进行中时直接等待其结果，而不是再发一次请求。
+        目前每个接口只有一个协调器在轮询，主要受益的是插座状态: 控制命令后
+        的刷新与周期轮询可能同时请求 outlet.cgi。
+
+        Args:
+            key: 接口标识
+            fetch: 实际执行请求的协程函数
+
+        Returns:
+            请求结果
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget_inflight(key, done))
+        # shield: 某个调用方被取消时不影响其他共享该请求的调用方
+        return await asyncio.shield(task)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        check: Optional[Callable[[bytes], bool]] = None,
+        retries: int = REQUEST_RETRIES,
+    ) -> Optional[bytes]:
+        """发送请求并返回响应体，失败时重新登录并按指数退避(带抖动)重试
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            data: 表单数据
+            headers: 额外请求头
+            check: 响应体校验函数，返回 False 时视为失败并重试
+            retries: 首次请求失败后的重试次数
+
+        Returns:
+            响应体字节，重试耗尽时返回 None
+        """
+        for attempt in range(retries + 1):
+            try:
+                await self.ensure_logged_in()
+                async with self.session.request(
+                    method, url, data=data, headers=headers
+                ) as resp:
+                    raw = await resp.read()
+                    self._record_success()
+                    # 非 200 或返回了登录页说明会话失效，下次尝试前重新登录
+                    if resp.status != 200 or self._is_login_page(raw):
+                        self._invalidate_login()
+                    elif check is None or check(raw):
+                        return raw
+                    _LOGGER.warning(
+                        "请求 %s 失败 (第 %d 次): HTTP %s", url, attempt + 1, resp.status
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # 网络抖动不代表会话失效，保留登录状态直接重试
+                _LOGGER.warning("请求 %s 失败 (第 %d 次): %s", url, attempt + 1, e)
+                self._record_failure()
+
+            if attempt < retries:
+                await asyncio.sleep(_backoff_delay(attempt))
+
+        _LOGGER.error("请求 %s 失败,已尝试 %d 次", url, retries + 1)
+        return None
+
+    async def get_outlet_status(self) -> Dict[str, Any]:
+        """获取插座状态
+
+        Returns:
+            列式数据 {"names": [...], "state": [...], "current": array, ...}，
+            各列下标为插座编号 - 1；失败时返回空字典
+        """
+        return await self._coalesced("outlets", self._fetch_outlet_status)
+
+    async def _fetch_outlet_status(self) -> Dict[str, Any]:
+        """请求并解析插座状态"""
+        raw = await self._request("GET", self._outlet_url)
+        if raw is None:
+            return {}
+
+        lines = raw.strip().split(b"\n")
+        
+        # 最后一行不是插座数据
+        data_end_line = len(lines) - 1
+        if (data_end_line - self._outlet_data_start) % OUTLET_LINES != 0:
+             # 尝试容错: 也许只有 10 行？或者根据 outlets 数量反推
+             _LOGGER.debug("数据行数 %d 可能不匹配预期", len(lines))
+
+        names: List[str] = []
+        # 状态列用列表: 设备偶尔返回 0/1 以外的值，原样保存而不让整次解析失败
+        states: List[int] = []
+        currents = array("d")
+        powers = array("d")
+        # 负载限制可能缺失(记为 None)，用列表而非 double 数组
+        current_mins: List[Optional[float]] = []
+        current_maxs: List[Optional[float]] = []
+        # 按预先算好的起始行直接索引，不切分子列表；
+        # 每个插座至少需要名称、状态、电流、功率 4 行
+        for base in self._outlet_bases:
+            if base + 3 >= data_end_line:
+                break
+            raw_state = self._parse_int(lines[base + 1])
+            if raw_state is None:
+                _LOGGER.warning("解析插座数据失败: 无效的插座状态 %r", lines[base + 1])
+                continue
+
+            names.append(self._decode_name(lines[base]))
+            states.append(1 - raw_state)
+            currents.append(self._parse_value(lines[base + 2], 100.0))
+            powers.append(self._parse_value(lines[base + 3], 1.0)) # Power is raw watts?
+
+            # 负载限制(可选，缺失时记为 None)
+            if base + 5 < data_end_line:
+                current_mins.append(self._parse_value(lines[base + 4], 100.0))
+                current_maxs.append(self._parse_value(lines[base + 5], 100.0))
+            else:
+                current_mins.append(None)
+                current_maxs.append(None)
+
+        return {
+            "names": names,
+            "state": states,
+            "current": currents,
+            "power": powers,
+            "current_min": current_mins,
+            "current_max": current_maxs,
+        }
 
     async def get_pdu_overview(self) -> Dict[str, Any]:
         """获取 PDU 电参总览"""
-        await self.ensure_logged_in()
+        return await self._coalesced("overview", self._fetch_pdu_overview)
 
-        try:
-            url = f"http://{self.host}/pm.cgi?pdu_index=0"
-            async with self.session.get(url) as resp:
-                if resp.status != 200:
-                    _LOGGER.error("获取 PDU 总览失败: HTTP %s", resp.status)
-                    return {}
-
-                text = await resp.text()
-                lines = text.strip().split("\n")
-
-                if len(lines) < 8:
-                    _LOGGER.error("PDU 总览响应格式无效")
-                    return {}
-
-                return {
-                    "voltage": self._parse_value(lines[4], 10.0),
-                    "current": self._parse_value(lines[3], 100.0),
-                    "total_power": self._parse_value(lines[5], 1.0),
-                    "power_factor": self._parse_value(lines[6], 1000.0),
-                    "total_energy": self._parse_value(lines[7], 100.0),
-                }
-
-        except (aiohttp.ClientError, ValueError, IndexError) as e:
-            _LOGGER.error("获取 PDU 总览错误: %s", e)
-            if isinstance(e, aiohttp.ClientError):
-                self._logged_in = False
+    async def _fetch_pdu_overview(self) -> Dict[str, Any]:
+        """请求并解析 PDU 电参总览"""
+        raw = await self._request("GET", self._overview_url)
+        if raw is None:
             return {}
 
+        # 只需要前 8 行，限制切分次数，不为尾部多余内容创建切片；
+        # 需去掉两端空白，否则截断的 7 行响应会因末尾换行多出一个空行而通过检查
+        lines = raw.strip().split(b"\n", 8)
+
+        if len(lines) < 8:
+            _LOGGER.error("PDU 总览响应格式无效")
+            return {}
+
+        overview = {
+            "voltage": self._parse_value(lines[4], 10.0),
+            "current": self._parse_value(lines[3], 100.0),
+            "total_power": self._parse_value(lines[5], 1.0),
+            "power_factor": self._parse_value(lines[6], 1000.0),
+            "total_energy": self._parse_value(lines[7], 100.0),
+        }
+        self._overview_keys = tuple(overview)
+        return overview
+
     async def get_daily_energy(self) -> Dict[str, Any]:
         """获取当天能耗数据"""
-        await self.ensure_logged_in()
-
-        try:
-            now = datetime.now()
-            url = (
-                f"http://{self.host}/energy.cgi?"
-                f"pdu_index=0&sy={now.year}&sm={now.month}&sd={now.day}"
-                f"&ey={now.year}&em={now.month}&ed={now.day}"
+        return await self._coalesced("daily", self._fetch_daily_energy)
+
+    async def _fetch_daily_energy(self) -> Dict[str, Any]:
+        """请求并解析当天能耗数据"""
+        now = datetime.now()
+        day_key = (now.year, now.month, now.day)
+        url_cache = self._daily_url_cache
+        if url_cache is None or url_cache[0] != day_key:
+            year, month, day = day_key
+            url_cache = self._daily_url_cache = (
+                day_key,
+                f"{self._daily_url}&sy={year}&sm={month}&sd={day}"
+                f"&ey={year}&em={month}&ed={day}",
             )
 
-            async with self.session.get(url) as resp:
-                if resp.status != 200:
-                    return {"total": {}, "outlets": []}
-
-                text = await resp.text()
-                lines = text.strip().split("\n")
-
-                if len(lines) < 4:
-                    return {"total": {}, "outlets": []}
-
-                total_data = lines[3].split(",")
-                total_val = {
-                    "start": self._parse_value(total_data[0], 100.0),
-                    "end": self._parse_value(total_data[1], 100.0),
-                    "today": self._parse_value(total_data[2], 100.0),
-                }
-
-                outlet_energy = []
-                for entry in lines[4:-1]:
-                    try:
-                        parts = entry.split(",")
-                        outlet_energy.append(
-                            {
-                                "name": parts[0],
-                                "start": self._parse_value(parts[1], 100.0),
-                                "end": self._parse_value(parts[2], 100.0),
-                                "today": self._parse_value(parts[3], 100.0),
-                            }
-                        )
-                    except (ValueError, IndexError):
-                        continue
-
-                return {
-                    "total": total_val,
-                    "outlets": outlet_energy,
-                }
-
-        except (aiohttp.ClientError, ValueError, IndexError) as e:
-            _LOGGER.error("获取每日能耗错误: %s", e)
-            if isinstance(e, aiohttp.ClientError):
-                self._logged_in = False
+        raw = await self._request("GET", url_cache[1])
+        if raw is None:
+            return {"total": {}, "outlets": []}
+
+        lines = raw.strip().split(b"\n")
+
+        if len(lines) < 4:
+            return {"total": {}, "outlets": []}
+
+        total_data = lines[3].split(b",")
+        if len(total_data) < 3:
+            _LOGGER.error("每日能耗响应格式无效")
             return {"total": {}, "outlets": []}
 
+        total_val = {
+            "start": self._parse_value(total_data[0], 100.0),
+            "end": self._parse_value(total_data[1], 100.0),
+            "today": self._parse_value(total_data[2], 100.0),
+        }
+
+        outlet_energy = []
+        for entry in lines[4:-1]:
+            parts = entry.split(b",")
+            if len(parts) < 4:
+                continue
+            outlet_energy.append(
+                DailyEnergyRow(
+                    self._decode_name(parts[0]),
+                    self._parse_value(parts[1], 100.0),
+                    self._parse_value(parts[2], 100.0),
+                    self._parse_value(parts[3], 100.0),
+                )
+            )
+
+        return {
+            "total": total_val,
+            "outlets": outlet_energy,
+        }
+
     async def set_outlet_state(self, outlet_idx: int, state: int) -> bool:
         """控制插座开关
         
@@ -248,72 +516,54 @@ class PDUClient:
             outlet_idx: 插座编号 (1-based)
             state: 1=开, 0=关
         """
-        await self.ensure_logged_in()
-
         idx = 1 - state
         outlet_key = f"t{outlet_idx - 1:02d}"
         data = {"pdu_index": "0", "idx": str(idx), outlet_key: "1"}
 
-        url = f"http://{self.host}/outlet.cgi"
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Referer": f"http://{self.host}/outlet.html",
-        }
-
-        # 重试逻辑,使用指数退避
-        for attempt in range(1, 4):
-            try:
-                async with self.session.post(url, data=data, headers=headers) as resp:
-                    text = await resp.text()
-                    if resp.status == 200 and ("success" in text or "succesd" in text):
-                        _LOGGER.info(f"插座 {outlet_idx} 设置为 {state} 成功")
-                        return True
-
-            except aiohttp.ClientError as e:
-                _LOGGER.warning("尝试 %s 失败,插座 %s: %s", attempt, outlet_idx, e)
-
-            if attempt < 3:
-                await asyncio.sleep(2 ** (attempt - 1))
-
-        _LOGGER.error("控制插座 %s (state=%s) 失败,已尝试 3 次", outlet_idx, state)
-        return False
-
-    async def get_outlet_energy(self) -> List[Dict[str, Any]]:
+        raw = await self._request(
+            "POST",
+            self._outlet_control_url,
+            data=data,
+            headers=self._control_headers,
+            # 设备返回 "success" 或 "succesd"，共同前缀一次匹配即可
+            check=lambda body: b"succes" in body,
+            retries=2,
+        )
+        if raw is None:
+            _LOGGER.error("控制插座 %s (state=%s) 失败", outlet_idx, state)
+            return False
+
+        # 控制前发出的插座状态请求返回的是旧状态，不再让后续刷新共享它，
+        # 保证控制后的刷新重新请求设备
+        self._inflight.pop("outlets", None)
+        _LOGGER.info("插座 %s 设置为 %s 成功", outlet_idx, state)
+        return True
+
+    async def get_outlet_energy(self) -> List[OutletEnergyRow]:
         """获取插座总能耗"""
-        await self.ensure_logged_in()
+        return await self._coalesced("outlet_energy", self._fetch_outlet_energy)
 
-        try:
-            url = f"http://{self.host}/outenergy.cgi?pdu_index=0"
-            async with self.session.get(url) as resp:
-                if resp.status != 200:
-                    return []
-
-                text = await resp.text()
-                lines = text.strip().split("\n")
-                
-                if len(lines) < 4:
-                    return []
-
-                outlet_energy = []
-                data_lines = lines[3:]  # 跳过前3行
-                
-                # 每个插座占2行
-                for i in range(0, len(data_lines) - 1, 2):
-                    try:
-                        name = data_lines[i].replace("d", "").strip()
-                        energy_kwh = self._parse_value(data_lines[i + 1], 100.0)
-                        
-                        outlet_energy.append({
-                            "name": name,
-                            "energy": energy_kwh,
-                        })
-                    except (ValueError, IndexError):
-                        continue
-
-                return outlet_energy
-
-        except aiohttp.ClientError as e:
-            _LOGGER.error("网络错误: %s", e)
-            self._logged_in = False
+    async def _fetch_outlet_energy(self) -> List[OutletEnergyRow]:
+        """请求并解析插座总能耗"""
+        raw = await self._request("GET", self._outlet_energy_url)
+        if raw is None:
             return []
 
+        lines = raw.strip().split(b"\n")
+        
+        if len(lines) < 4:
+            return []
+
+        outlet_energy = []
+        data_lines = lines[3:]  # 跳过前3行
+        
+        # 每个插座占2行
+        for i in range(0, len(data_lines) - 1, 2):
+            outlet_energy.append(
+                OutletEnergyRow(
+                    self._decode_name(data_lines[i].replace(b"d", b"")),
+                    self._parse_value(data_lines[i + 1], 100.0),
+                )
+            )
+
+        return outlet_energy
@@ -11,6 +11,7 @@ from homeassistant.const import (
     UnitOfPower,
     UnitOfEnergy,
 )
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 
@@ -24,6 +25,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     data = hass.data[DOMAIN][entry.entry_id]
     client = data["client"]
     coordinator = data["coordinator"]
+    energy_coordinator = data["energy_coordinator"]
     outlets = data["outlets"]
     pdu_name = entry.data.get("pdu_name", "Changsui PDU")
 
@@ -86,7 +88,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     # 今日总能耗
     entities.append(
         PDUDailyEnergySensor(
-            coordinator,
+            energy_coordinator,
             device_info,
             "energy_today",
             "今日能耗",
@@ -104,7 +106,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
             # 总能耗
             entities.append(
                 PDUOutletEnergySensor(
-                    coordinator,
+                    energy_coordinator,
                     device_info,
                     energy_tracker,
                     idx,
@@ -115,7 +117,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
             # 今日用电
             entities.append(
                 PDUOutletEnergySensor(
-                    coordinator,
+                    energy_coordinator,
                     device_info,
                     energy_tracker,
                     idx,
@@ -126,7 +128,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
             # 昨日用电
             entities.append(
                 PDUOutletEnergySensor(
-                    coordinator,
+                    energy_coordinator,
                     device_info,
                     energy_tracker,
                     idx,
@@ -208,15 +210,21 @@ class PDUOutletSensor(CoordinatorEntity, SensorEntity):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_device_info = device_info
         self._attr_has_entity_name = True
+        self._attr_native_value = self._read_value()
 
-    @property
-    def native_value(self):
-        """返回传感器值"""
-        outlets = self.coordinator.data.get("outlets", [])
-        if self.idx <= len(outlets):
-            return outlets[self.idx - 1].get(self.key)
+    def _read_value(self):
+        """从协调器数据中读取本插座的值"""
+        values = self.coordinator.data.get("outlets", {}).get(self.key, ())
+        if self.idx <= len(values):
+            return values[self.idx - 1]
         return None
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """协调器更新时缓存传感器值，渲染状态时直接读取"""
+        self._attr_native_value = self._read_value()
+        super()._handle_coordinator_update()
+
     @property
     def available(self):
         """返回实体是否可用"""
@@ -296,10 +304,10 @@ class PDUOutletEnergySensor(CoordinatorEntity, SensorEntity):
             
         self._attr_device_info = device_info
         self._attr_has_entity_name = True
+        self._attr_native_value = self._read_value()
 
-    @property
-    def native_value(self):
-        """返回传感器值"""
+    def _read_value(self):
+        """从能耗追踪器中读取本插座的值"""
         if self.energy_type == "total":
             return self.energy_tracker.get_total_energy(self.idx)
         elif self.energy_type == "today":
@@ -308,6 +316,12 @@ class PDUOutletEnergySensor(CoordinatorEntity, SensorEntity):
             return self.energy_tracker.get_yesterday_usage(self.idx)
         return None
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """协调器更新时缓存传感器值(追踪器只在能耗轮询时变化)"""
+        self._attr_native_value = self._read_value()
+        super()._handle_coordinator_update()
+
     @property
     def available(self):
         """返回实体是否可用"""
@@ -1,11 +1,13 @@
 """PDU Switch 平台 - 优化版本"""
 import logging
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.exceptions import HomeAssistantError
 
 from . import DOMAIN
+from .pdu_client import PDUUnavailableError, outlet_view
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -59,15 +61,21 @@ class ChangsuiPDUSwitch(CoordinatorEntity, SwitchEntity):
         self._attr_unique_id = f"{client.host}_outlet{idx}"
         self._attr_device_info = device_info
         self._attr_has_entity_name = True
+        self._attr_is_on = self._read_state()
 
-    @property
-    def is_on(self):
-        """返回开关状态"""
-        outlets = self.coordinator.data.get("outlets", [])
-        if self.idx <= len(outlets):
-            return outlets[self.idx - 1]["state"] == 1
+    def _read_state(self):
+        """从协调器数据中读取本插座的开关状态"""
+        states = self.coordinator.data.get("outlets", {}).get("state", ())
+        if self.idx <= len(states):
+            return states[self.idx - 1] == 1
         return None
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """协调器更新时缓存开关状态，渲染状态时直接读取"""
+        self._attr_is_on = self._read_state()
+        super()._handle_coordinator_update()
+
     @property
     def available(self):
         """返回实体是否可用"""
@@ -78,9 +86,8 @@ class ChangsuiPDUSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def extra_state_attributes(self):
         """返回额外的状态属性"""
-        outlets = self.coordinator.data.get("outlets", [])
-        if self.idx <= len(outlets):
-            outlet_data = outlets[self.idx - 1]
+        outlet_data = outlet_view(self.coordinator.data.get("outlets", {}), self.idx)
+        if outlet_data is not None:
             attrs = {
                 "插座名称": outlet_data.get("name", f"Outlet {self.idx}"),
                 "电流": outlet_data.get("current", 0),
@@ -110,7 +117,10 @@ class ChangsuiPDUSwitch(CoordinatorEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs):
         """打开插座"""
-        success = await self.client.set_outlet_state(self.idx, 1)
+        try:
+            success = await self.client.set_outlet_state(self.idx, 1)
+        except PDUUnavailableError as e:
+            raise HomeAssistantError(str(e)) from e
 
         if success:
             _LOGGER.info("插座 %s 已打开", self.idx)
@@ -122,7 +132,10 @@ class ChangsuiPDUSwitch(CoordinatorEntity, SwitchEntity):
 
     async def async_turn_off(self, **kwargs):
         """关闭插座"""
-        success = await self.client.set_outlet_state(self.idx, 0)
+        try:
+            success = await self.client.set_outlet_state(self.idx, 0)
+        except PDUUnavailableError as e:
+            raise HomeAssistantError(str(e)) from e
 
         if success:
             _LOGGER.info("插座 %s 已关闭", self.idx)
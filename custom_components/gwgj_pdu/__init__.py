@@ -1,4 +1,5 @@
 """PDU 组件主入口"""
+import asyncio
 import logging
 import os
 
@@ -21,6 +22,25 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SWITCH, Platform.SENSOR]
 
+# 已确认存在的数据根目录，同一 Home Assistant 实例内只需创建一次
+_created_storage_roots = set()
+
+
+def _ensure_storage_dir(storage_dir: str):
+    """创建条目数据目录(在执行器中运行)
+
+    根目录每个实例只创建一次；条目目录直接 mkdir，已存在时忽略，
+    省去 makedirs 对每级路径的存在性检查。
+    """
+    root = os.path.dirname(storage_dir)
+    if root not in _created_storage_roots:
+        os.makedirs(root, exist_ok=True)
+        _created_storage_roots.add(root)
+    try:
+        os.mkdir(storage_dir)
+    except FileExistsError:
+        pass
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """设置 PDU 集成"""
@@ -38,7 +58,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # 数据存储路径优化：移动到 .storage 目录下，避免污染组件目录
     # entry_id 是配置条目的唯一 ID，重启后不会改变，因此 ID 是固定的
     storage_dir = hass.config.path(".storage", "gwgj_pdu_data", entry.entry_id)
-    os.makedirs(storage_dir, exist_ok=True)
+    await hass.async_add_executor_job(_ensure_storage_dir, storage_dir)
     
     # 向下兼容：如果旧目录存在数据，尝试迁移(可选，暂不实现，假设是新环境)
     data_dir = storage_dir
@@ -46,8 +66,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # 创建协调器
     coordinator = PduCoordinator(hass)
     
-    # 创建设备注册表
-    device_registry = DeviceRegistry(hass, data_dir)
+    # 创建设备注册表(设备上线/离线时通知对应实体刷新可用状态)
+    device_registry = DeviceRegistry(
+        hass, data_dir, on_connection_change=coordinator.async_notify_pdu
+    )
     await device_registry.async_load_devices()
 
     # 根据配置选择 Server 或 Client
@@ -70,11 +92,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         DATA_SERVER: server,
     }
 
-    # 启动
-    await server.start()
-    
-    # 设置平台
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # 启动并设置平台
+    forward_setups = hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if protocol == PROTOCOL_CLIENT:
+        # Client 首次轮询得到的传感器类型决定平台创建哪些实体，需先完成
+        await server.start()
+        await forward_setups
+    else:
+        # Server 只是开始监听端口，与平台设置互不依赖，并行执行
+        await asyncio.gather(server.start(), forward_setups)
 
     # 注册更新监听器
     unsub = entry.add_update_listener(async_reload_entry)
@@ -97,6 +123,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             await server.stop()
             _LOGGER.info("PDU 服务已停止")
 
+        # 写入尚未保存的设备配置
+        device_registry = data.get(DATA_DEVICE_REGISTRY)
+        if device_registry:
+            await device_registry.async_flush()
+
         # 移除更新监听器
         unsub = data.get(DATA_UNSUB)
         if unsub:
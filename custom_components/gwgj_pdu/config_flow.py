@@ -26,6 +26,31 @@ from .const import (
     DEFAULT_WEB_PASSWORD,
 )
 
+LOG_LEVELS = ["debug", "info", "warning", "error", "critical"]
+
+# 表单结构固定不变，模块加载时构建一次
+SERVER_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HOST, default=DEFAULT_HOST): str,
+        vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
+        vol.Required(CONF_LOG_LEVEL, default=DEFAULT_LOG_LEVEL): vol.In(LOG_LEVELS),
+        vol.Required(
+            CONF_FETCH_OUTLET_CURRENT, default=DEFAULT_FETCH_OUTLET_CURRENT
+        ): bool,
+        vol.Required(CONF_WEB_USERNAME, default=DEFAULT_WEB_USERNAME): str,
+        vol.Required(CONF_WEB_PASSWORD, default=DEFAULT_WEB_PASSWORD): str,
+    }
+)
+
+CLIENT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HOST): str,
+        vol.Required(CONF_PORT, default=80): int,
+        vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
+        vol.Required(CONF_LOG_LEVEL, default=DEFAULT_LOG_LEVEL): vol.In(LOG_LEVELS),
+    }
+)
+
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """PDU 配置流程"""
@@ -59,24 +84,9 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data=user_input,
             )
 
-        data_schema = vol.Schema(
-            {
-                vol.Required(CONF_HOST, default=DEFAULT_HOST): str,
-                vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
-                vol.Required(CONF_LOG_LEVEL, default=DEFAULT_LOG_LEVEL): vol.In(
-                    ["debug", "info", "warning", "error", "critical"]
-                ),
-                vol.Required(
-                    CONF_FETCH_OUTLET_CURRENT, default=DEFAULT_FETCH_OUTLET_CURRENT
-                ): bool,
-                vol.Required(CONF_WEB_USERNAME, default=DEFAULT_WEB_USERNAME): str,
-                vol.Required(CONF_WEB_PASSWORD, default=DEFAULT_WEB_PASSWORD): str,
-            }
-        )
-
         return self.async_show_form(
             step_id="server_config", 
-            data_schema=data_schema,
+            data_schema=SERVER_SCHEMA,
             errors=errors
         )
 
@@ -97,19 +107,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data=user_input,
             )
 
-        data_schema = vol.Schema(
-            {
-                vol.Required(CONF_HOST): str,
-                vol.Required(CONF_PORT, default=80): int,
-                vol.Required(CONF_PASSWORD, default=DEFAULT_PASSWORD): str,
-                vol.Required(CONF_LOG_LEVEL, default=DEFAULT_LOG_LEVEL): vol.In(
-                    ["debug", "info", "warning", "error", "critical"]
-                ),
-            }
-        )
-
         return self.async_show_form(
             step_id="client_config", 
-            data_schema=data_schema,
+            data_schema=CLIENT_SCHEMA,
             errors=errors
         )
@@ -57,3 +57,6 @@ PROTOCOL_CLIENT = "client"  # HTTP Client Mode (Active)
 CONF_PASSWORD = "password"
 DEFAULT_PASSWORD = "admin"
 
+# 设备 Web 接口的 TCP 连接超时(秒)，局域网设备无响应时尽快放弃
+WEB_CONNECT_TIMEOUT = 3.0
+
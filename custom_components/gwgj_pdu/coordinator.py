@@ -1,15 +1,62 @@
 """PDU 数据协调器"""
 import logging
-from typing import Dict, Any, Optional
+from array import array
+from typing import Callable, Dict, Any, FrozenSet, List, Optional
 from datetime import timedelta
 import time
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class PduState:
+    """单个 PDU 的状态数据
+
+    开关状态以位掩码保存: 第 n 个开关对应第 n-1 位，1 为开、0 为关。
+    """
+
+    __slots__ = (
+        "num_switches",
+        "switches",
+        "sensors",
+        "available_sensors",
+        "debounce_state",
+        "debounce_ts",
+    )
+
+    def __init__(self, num_switches: int):
+        """初始化 PDU 状态
+        
+        Args:
+            num_switches: 开关数量
+        """
+        self.num_switches = num_switches
+        self.switches = 0
+        # 传感器数据: {sensor_type: value}
+        self.sensors: Dict[str, Any] = {}
+        # 可用的传感器类型(根据实际接收到的数据动态添加)
+        # 不可变集合，只在出现新类型时替换，读取方可直接共享
+        self.available_sensors: FrozenSet[str] = frozenset()
+        # 防抖缓存: 按开关编号索引的最近状态(1 开 0 关)与时间 (monotonic)
+        self.debounce_state = bytearray(num_switches + 1)
+        self.debounce_ts = array("d", [0.0]) * (num_switches + 1)
+
+    def ensure_switch(self, switch_number: int):
+        """确保开关编号在范围内，超出时扩展开关数量
+        
+        Args:
+            switch_number: 开关编号(1-based)
+        """
+        if switch_number <= self.num_switches:
+            return
+        extra = switch_number - self.num_switches
+        self.debounce_state.extend(bytes(extra))
+        self.debounce_ts.extend([0.0] * extra)
+        self.num_switches = switch_number
+
+
 class PduCoordinator(DataUpdateCoordinator):
     """PDU 数据协调器,管理所有 PDU 的状态数据"""
 
@@ -26,11 +73,12 @@ class PduCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=30),  # 定期更新间隔(用于检查超时等)
         )
         # 存储每个 PDU 的状态数据
-        # 格式: {pdu_id: {switch_1: "on", switch_2: "off", ..., power: 100, ...}}
-        self.data: Dict[str, Dict[str, Any]] = {}
+        # 格式: {pdu_id: PduState}
+        self.data: Dict[str, PduState] = {}
         
-        # 防抖缓存
-        self._last_state: Dict[tuple, tuple] = {}  # (pdu_id, entity_id) -> (state, timestamp)
+        # 按 PDU 分组的监听器: {pdu_id: [callback, ...]}
+        # 推送数据只通知对应 PDU 的实体，不广播给所有实体
+        self._pdu_listeners: Dict[str, List[Callable[[], None]]] = {}
 
     async def _async_update_data(self):
         """定期更新数据(可选实现)"""
@@ -38,14 +86,48 @@ class PduCoordinator(DataUpdateCoordinator):
         # 主要的状态更新通过 update_switch_state 等方法直接推送
         return self.data
 
-    def get_pdu_data(self, pdu_id: str) -> Optional[Dict[str, Any]]:
+    @callback
+    def async_add_pdu_listener(
+        self, pdu_id: str, update_callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """注册指定 PDU 的数据更新监听器
+        
+        Args:
+            pdu_id: PDU 设备 ID
+            update_callback: 数据更新时调用的回调
+            
+        Returns:
+            取消监听的函数
+        """
+        listeners = self._pdu_listeners.setdefault(pdu_id, [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+            if not listeners:
+                self._pdu_listeners.pop(pdu_id, None)
+
+        return remove_listener
+
+    @callback
+    def async_notify_pdu(self, pdu_id: str):
+        """通知指定 PDU 的监听器(数据更新或设备上线/离线时调用)
+
+        Args:
+            pdu_id: PDU 设备 ID
+        """
+        for update_callback in list(self._pdu_listeners.get(pdu_id, ())):
+            update_callback()
+
+    def get_pdu_data(self, pdu_id: str) -> Optional[PduState]:
         """获取指定 PDU 的数据
         
         Args:
             pdu_id: PDU 设备 ID
             
         Returns:
-            PDU 数据字典,如果不存在则返回 None
+            PDU 状态数据,如果不存在则返回 None
         """
         return self.data.get(pdu_id)
 
@@ -57,12 +139,8 @@ class PduCoordinator(DataUpdateCoordinator):
             num_switches: 开关数量
         """
         if pdu_id not in self.data:
-            self.data[pdu_id] = {}
-            # 初始化开关状态
-            for i in range(1, num_switches + 1):
-                self.data[pdu_id][f"switch_{i}"] = "off"
-            # 记录可用的传感器类型(根据实际接收到的数据动态添加)
-            self.data[pdu_id]["_available_sensors"] = set()
+            # 开关初始状态均为关
+            self.data[pdu_id] = PduState(num_switches)
             _LOGGER.debug(f"初始化 PDU {pdu_id} 数据结构")
 
     def remove_pdu(self, pdu_id: str):
@@ -93,23 +171,36 @@ class PduCoordinator(DataUpdateCoordinator):
         Returns:
             是否更新成功(如果被防抖则返回 False)
         """
+        if switch_number < 1:
+            _LOGGER.debug(f"PDU {pdu_id} 忽略无效开关编号 {switch_number}")
+            return False
+
         if pdu_id not in self.data:
             self.init_pdu(pdu_id)
 
+        pdu = self.data[pdu_id]
+        pdu.ensure_switch(switch_number)
+
         # 防抖检查
-        key = (pdu_id, f"switch_{switch_number}")
-        now = time.time()
-        last = self._last_state.get(key)
-        
-        if last and last[0] == state and (now - last[1]) < debounce_sec:
+        new_state = 1 if state == "on" else 0
+        now = time.monotonic()
+        if (
+            pdu.debounce_state[switch_number] == new_state
+            and now - pdu.debounce_ts[switch_number] < debounce_sec
+        ):
             return False  # 防抖,忽略此次更新
         
         # 更新状态
-        self._last_state[key] = (state, now)
-        self.data[pdu_id][f"switch_{switch_number}"] = state
+        pdu.debounce_state[switch_number] = new_state
+        pdu.debounce_ts[switch_number] = now
+        bit = 1 << (switch_number - 1)
+        if new_state:
+            pdu.switches |= bit
+        else:
+            pdu.switches &= ~bit
         
-        # 通知订阅者
-        self.async_set_updated_data(self.data)
+        # 通知该 PDU 的订阅者
+        self.async_notify_pdu(pdu_id)
         _LOGGER.debug(f"PDU {pdu_id} Switch {switch_number} -> {state}")
         return True
 
@@ -129,16 +220,40 @@ class PduCoordinator(DataUpdateCoordinator):
         if pdu_id not in self.data:
             self.init_pdu(pdu_id)
 
+        pdu = self.data[pdu_id]
         # 记录传感器类型(用于动态创建实体)
-        if "_available_sensors" in self.data[pdu_id]:
-            self.data[pdu_id]["_available_sensors"].add(sensor_type)
-
-        self.data[pdu_id][sensor_type] = value
+        if sensor_type not in pdu.available_sensors:
+            pdu.available_sensors = pdu.available_sensors | {sensor_type}
+        pdu.sensors[sensor_type] = value
         
-        # 通知订阅者
-        self.async_set_updated_data(self.data)
+        # 通知该 PDU 的订阅者
+        self.async_notify_pdu(pdu_id)
         _LOGGER.debug(f"PDU {pdu_id} {sensor_type} -> {value}")
 
+    def update_sensor_batch(self, pdu_id: str, updates: Dict[str, Any]):
+        """批量更新同一帧解析出的传感器数据，只通知一次订阅者
+        
+        Args:
+            pdu_id: PDU 设备 ID
+            updates: {传感器类型: 传感器值}
+        """
+        if not updates:
+            return
+        if pdu_id not in self.data:
+            self.init_pdu(pdu_id)
+
+        pdu = self.data[pdu_id]
+        # 记录传感器类型(用于动态创建实体)
+        if not pdu.available_sensors.issuperset(updates):
+            pdu.available_sensors = pdu.available_sensors.union(updates)
+
+        pdu.sensors.update(updates)
+
+        # 通知该 PDU 的订阅者
+        self.async_notify_pdu(pdu_id)
+        # 每帧都会调用，使用惰性格式化，未开启调试日志时不格式化字典
+        _LOGGER.debug("PDU %s 批量更新传感器: %s", pdu_id, updates)
+
     def update_all_switches(self, pdu_id: str, io_value: int):
         """根据 IO 值更新所有开关状态
         
@@ -149,14 +264,17 @@ class PduCoordinator(DataUpdateCoordinator):
         if pdu_id not in self.data:
             self.init_pdu(pdu_id)
 
-        for i in range(1, 9):  # 假设最多 8 个开关
-            state = "on" if (io_value & (1 << (i - 1))) else "off"
-            key = f"switch_{i}"
-            if key in self.data[pdu_id]:
-                self.data[pdu_id][key] = state
+        # IO 值最多表示 8 个开关，只更新已存在的开关对应的位
+        pdu = self.data[pdu_id]
+        mask = (1 << min(pdu.num_switches, 8)) - 1
+        switches = (pdu.switches & ~mask) | (io_value & mask)
+        # 设备周期上报的 IO 值大多与当前状态相同，此时无需通知订阅者
+        if switches == pdu.switches:
+            return
+        pdu.switches = switches
 
-        # 通知订阅者
-        self.async_set_updated_data(self.data)
+        # 通知该 PDU 的订阅者
+        self.async_notify_pdu(pdu_id)
         _LOGGER.debug(f"PDU {pdu_id} 批量更新开关状态: {io_value}")
 
     def get_switch_state(self, pdu_id: str, switch_number: int) -> Optional[str]:
@@ -169,9 +287,10 @@ class PduCoordinator(DataUpdateCoordinator):
         Returns:
             状态 "on" 或 "off",如果不存在则返回 None
         """
-        if pdu_id in self.data:
-            return self.data[pdu_id].get(f"switch_{switch_number}")
-        return None
+        pdu = self.data.get(pdu_id)
+        if pdu is None or not 0 < switch_number <= pdu.num_switches:
+            return None
+        return "on" if (pdu.switches >> (switch_number - 1)) & 1 else "off"
 
     def get_sensor_value(self, pdu_id: str, sensor_type: str) -> Optional[Any]:
         """获取传感器值
@@ -183,19 +302,21 @@ class PduCoordinator(DataUpdateCoordinator):
         Returns:
             传感器值,如果不存在则返回 None
         """
-        if pdu_id in self.data:
-            return self.data[pdu_id].get(sensor_type)
-        return None
+        pdu = self.data.get(pdu_id)
+        if pdu is None:
+            return None
+        return pdu.sensors.get(sensor_type)
 
-    def get_available_sensors(self, pdu_id: str) -> set:
+    def get_available_sensors(self, pdu_id: str) -> FrozenSet[str]:
         """获取 PDU 可用的传感器类型
         
         Args:
             pdu_id: PDU 设备 ID
             
         Returns:
-            传感器类型集合
+            传感器类型集合(只读，无需复制)
         """
-        if pdu_id in self.data and "_available_sensors" in self.data[pdu_id]:
-            return self.data[pdu_id]["_available_sensors"].copy()
-        return set()
+        pdu = self.data.get(pdu_id)
+        if pdu is None:
+            return frozenset()
+        return pdu.available_sensors
@@ -1,13 +1,18 @@
 """PDU 设备注册管理器"""
 import os
-import json
 import logging
-from typing import Dict, Optional, Any
+import time
+from typing import Callable, Dict, Iterator, Optional, Any, Set, Tuple
 from datetime import datetime
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
 
 from .const import (
+    DOMAIN,
     CONF_IDENTIFIERS,
     CONF_MANUFACTURER,
     CONF_MODEL,
@@ -23,29 +28,63 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# 延迟写盘秒数，合并短时间内的多次修改(重连、last_seen 更新等)
+SAVE_DELAY = 10
+
+# last_seen 时间戳按秒缓存: 同一秒内的多次更新复用同一个字符串
+_now_iso_sec = 0
+_now_iso_str = ""
+
+
+def _now_iso() -> str:
+    """返回当前本地时间的 ISO 字符串(精确到秒，同一秒内复用)"""
+    global _now_iso_sec, _now_iso_str
+    sec = int(time.time())
+    if sec != _now_iso_sec:
+        _now_iso_sec = sec
+        _now_iso_str = datetime.fromtimestamp(sec).isoformat()
+    return _now_iso_str
+
 
 class DeviceRegistry:
     """管理 PDU 设备注册信息"""
 
-    def __init__(self, hass: HomeAssistant, data_dir: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        data_dir: str,
+        on_connection_change: Optional[Callable[[str], None]] = None,
+    ):
         """初始化设备注册表
         
         Args:
             hass: Home Assistant 实例
             data_dir: 数据存储目录
+            on_connection_change: 设备上线/离线时的回调，参数为 PDU 设备 ID
         """
         self.hass = hass
         self.data_dir = data_dir
         self.devices_file = os.path.join(data_dir, "devices.json")
         self.devices: Dict[str, Dict[str, Any]] = {}
+        # 待执行的延迟保存(取消函数)，以及为其注册的停止事件监听
+        self._cancel_save: Optional[Callable[[], None]] = None
+        self._unsub_stop: Optional[Callable[[], None]] = None
+        # 每个设备序列化后的 JSON 片段，设备修改时失效，保存时只重新编码变化的设备
+        self._entry_json: Dict[str, bytes] = {}
+        # 当前在线的设备 ID，与各设备的 connected 字段同步维护，供实体判断可用状态
+        self.connected_pdus: Set[str] = set()
+        self._on_connection_change = on_connection_change
+        # 每个设备的 HA 设备信息，同一 PDU 的所有实体共用，设备配置修改时失效
+        self._device_info: Dict[str, Dict[str, Any]] = {}
 
     async def async_load_devices(self):
         """从文件加载设备配置"""
         if os.path.exists(self.devices_file):
             try:
+                # 一次读入全部内容，交给 orjson 解析(与保存时的编码器一致)
                 def _load():
-                    with open(self.devices_file, "r", encoding="utf-8") as f:
-                        return json.load(f)
+                    with open(self.devices_file, "rb") as f:
+                        return json_loads(f.read())
                 
                 self.devices = await self.hass.async_add_executor_job(_load)
                 _LOGGER.info(f"已加载 {len(self.devices)} 个 PDU 设备配置")
@@ -54,20 +93,83 @@ class DeviceRegistry:
                 self.devices = {}
         else:
             self.devices = {}
+        self._device_info.clear()
+        self.connected_pdus = {
+            pdu_id for pdu_id, device in self.devices.items()
+            if device.get("connected", False)
+        }
+
+    def _serialize_devices(self) -> bytes:
+        """将设备配置编码为 JSON，复用未变化设备的缓存片段"""
+        cache = self._entry_json
+        parts = []
+        for pdu_id, device in self.devices.items():
+            blob = cache.get(pdu_id)
+            if blob is None:
+                blob = cache[pdu_id] = json_bytes(device)
+            parts.append(json_bytes(pdu_id) + b":" + blob)
+        return b"{" + b",".join(parts) + b"}"
 
     async def _async_save_devices(self):
         """保存设备配置到文件"""
         try:
+            # 在事件循环中完成编码，执行器线程只负责写文件
+            payload = self._serialize_devices()
+
+            # 数据目录已在 async_setup_entry 中创建，这里不再逐次检查
             def _save():
-                os.makedirs(self.data_dir, exist_ok=True)
-                with open(self.devices_file, "w", encoding="utf-8") as f:
-                    json.dump(self.devices, f, indent=2, ensure_ascii=False)
+                # 先写临时文件再原子替换，写入中途异常也不会损坏原文件
+                tmp_file = self.devices_file + ".tmp"
+                with open(tmp_file, "wb") as f:
+                    f.write(payload)
+                    f.flush()
+                os.replace(tmp_file, self.devices_file)
             
             await self.hass.async_add_executor_job(_save)
             _LOGGER.debug("设备配置已保存")
         except Exception as e:
             _LOGGER.error(f"保存设备配置失败: {e}")
 
+    @callback
+    def _mark_changed(self, pdu_id: str):
+        """标记设备配置已修改，使其 JSON 缓存失效并安排保存"""
+        self._entry_json.pop(pdu_id, None)
+        self._schedule_save()
+
+    @callback
+    def _schedule_save(self):
+        """安排一次延迟保存，已有待执行的保存时直接复用"""
+        if self._cancel_save is not None:
+            return
+        self._cancel_save = async_call_later(
+            self.hass, SAVE_DELAY, self._async_handle_save_timer
+        )
+        # Home Assistant 停止时立即写入，避免丢失延迟期内的修改
+        if self._unsub_stop is None:
+            self._unsub_stop = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+            )
+
+    async def _async_handle_save_timer(self, _now):
+        """延迟保存到期"""
+        await self.async_flush()
+
+    async def _async_handle_stop(self, _event: Event):
+        """Home Assistant 停止时写入未保存的修改"""
+        self._unsub_stop = None
+        await self.async_flush()
+
+    async def async_flush(self):
+        """立即写入尚未保存的修改(卸载或停止时调用)"""
+        if self._cancel_save is None:
+            return
+        self._cancel_save()
+        self._cancel_save = None
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        await self._async_save_devices()
+
     async def async_register_device(self, pdu_id: str, auto_create: bool = True) -> bool:
         """注册新设备
         
@@ -78,23 +180,60 @@ class DeviceRegistry:
         Returns:
             是否成功注册
         """
-        if pdu_id in self.devices:
-            # 更新连接状态和最后在线时间
-            self.devices[pdu_id]["connected"] = True
-            self.devices[pdu_id]["last_seen"] = datetime.now().isoformat()
-            await self._async_save_devices()
+        device = self.devices.get(pdu_id)
+        if device is not None:
+            self._set_online(pdu_id, True)
+            # 已在线且同一秒内已记录过，无需任何修改
+            if not self._touch_connected(device):
+                return True
+            self._mark_changed(pdu_id)
             _LOGGER.info(f"PDU {pdu_id} 重新连接")
             return True
 
         if auto_create:
             # 创建默认配置
             self.devices[pdu_id] = self._create_default_config(pdu_id)
-            await self._async_save_devices()
+            self._set_online(pdu_id, True)
+            self._mark_changed(pdu_id)
             _LOGGER.info(f"PDU {pdu_id} 已自动注册")
             return True
 
         return False
 
+    @callback
+    def _set_online(self, pdu_id: str, online: bool):
+        """更新在线设备集合，状态变化时通知回调
+
+        Args:
+            pdu_id: PDU 设备 ID
+            online: 是否在线
+        """
+        if online == (pdu_id in self.connected_pdus):
+            return
+        if online:
+            self.connected_pdus.add(pdu_id)
+        else:
+            self.connected_pdus.discard(pdu_id)
+        if self._on_connection_change is not None:
+            self._on_connection_change(pdu_id)
+
+    @staticmethod
+    def _touch_connected(device: Dict[str, Any]) -> bool:
+        """将设备标记为在线并刷新最后在线时间
+
+        Args:
+            device: 设备配置字典
+
+        Returns:
+            是否有实际变化(已在线且 last_seen 为同一秒时返回 False)
+        """
+        now_iso = _now_iso()
+        if device.get("connected") is True and device.get("last_seen") == now_iso:
+            return False
+        device["connected"] = True
+        device["last_seen"] = now_iso
+        return True
+
     def _create_default_config(self, pdu_id: str) -> Dict[str, Any]:
         """创建默认设备配置
         
@@ -112,7 +251,7 @@ class DeviceRegistry:
             CONF_SW_VERSION: DEFAULT_SW_VERSION,
             CONF_CONFIGURATION_URL: None,
             "connected": True,
-            "last_seen": datetime.now().isoformat(),
+            "last_seen": _now_iso(),
             CONF_NUM_SWITCHES: DEFAULT_NUM_SWITCHES,
         }
 
@@ -132,7 +271,8 @@ class DeviceRegistry:
 
         # 更新配置,保留连接状态
         self.devices[pdu_id].update(config)
-        await self._async_save_devices()
+        self._device_info.pop(pdu_id, None)
+        self._mark_changed(pdu_id)
         _LOGGER.info(f"PDU {pdu_id} 配置已更新")
         return True
 
@@ -147,6 +287,33 @@ class DeviceRegistry:
         """
         return self.devices.get(pdu_id)
 
+    def get_device_info(self, pdu_id: str) -> Optional[Dict[str, Any]]:
+        """获取 HA 设备信息(同一 PDU 的实体共用同一个字典)
+
+        Args:
+            pdu_id: PDU 设备 ID
+
+        Returns:
+            设备信息字典,如果设备不存在则返回 None
+        """
+        info = self._device_info.get(pdu_id)
+        if info is not None:
+            return info
+
+        device_config = self.devices.get(pdu_id)
+        if not device_config:
+            return None
+
+        info = self._device_info[pdu_id] = {
+            "identifiers": {(DOMAIN, pdu_id)},
+            "name": device_config.get("name", f"PDU {pdu_id}"),
+            "manufacturer": device_config.get("manufacturer", "Generic"),
+            "model": device_config.get("model", "PDU"),
+            "sw_version": device_config.get("sw_version", "1.0.0"),
+            "configuration_url": device_config.get("configuration_url"),
+        }
+        return info
+
     def get_all_devices(self) -> Dict[str, Dict[str, Any]]:
         """获取所有设备配置
         
@@ -155,6 +322,16 @@ class DeviceRegistry:
         """
         return self.devices.copy()
 
+    def iter_devices(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """遍历所有设备配置(不复制)
+
+        遍历期间不能修改注册表，调用方需在同一次同步执行内用完。
+
+        Returns:
+            (pdu_id, 设备配置) 迭代器
+        """
+        return iter(self.devices.items())
+
     async def async_set_device_connected(self, pdu_id: str, connected: bool):
         """设置设备连接状态
         
@@ -162,11 +339,19 @@ class DeviceRegistry:
             pdu_id: PDU 设备 ID
             connected: 是否已连接
         """
-        if pdu_id in self.devices:
-            self.devices[pdu_id]["connected"] = connected
-            if connected:
-                self.devices[pdu_id]["last_seen"] = datetime.now().isoformat()
-            await self._async_save_devices()
+        device = self.devices.get(pdu_id)
+        if device is None:
+            return
+        if connected:
+            self._set_online(pdu_id, True)
+            if not self._touch_connected(device):
+                return
+        elif device.get("connected") is False:
+            return
+        else:
+            device["connected"] = False
+            self._set_online(pdu_id, False)
+        self._mark_changed(pdu_id)
 
     def is_device_registered(self, pdu_id: str) -> bool:
         """检查设备是否已注册
@@ -190,7 +375,9 @@ class DeviceRegistry:
         """
         if pdu_id in self.devices:
             del self.devices[pdu_id]
-            await self._async_save_devices()
+            self._device_info.pop(pdu_id, None)
+            self._set_online(pdu_id, False)
+            self._mark_changed(pdu_id)
             _LOGGER.info(f"PDU {pdu_id} 已移除")
             return True
         return False
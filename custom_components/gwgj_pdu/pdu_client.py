@@ -3,7 +3,6 @@ import logging
 import asyncio
 import urllib.parse
 import re
-import math
 from datetime import timedelta
 from typing import Optional
 
@@ -13,10 +12,16 @@ from homeassistant.const import CONF_HOST, CONF_PORT, CONF_PASSWORD
 
 from .coordinator import PduCoordinator
 from .device_registry import DeviceRegistry
-from .const import CONF_NUM_SWITCHES
+from .const import WEB_CONNECT_TIMEOUT
 
 _LOGGER = logging.getLogger(__name__)
 
+# 预编译的正则表达式，避免每次解析时查找 re 模块缓存
+_CLASSTEMP_RE = re.compile(r"var\s+classtemp\s*=\s*'([^']+)'")
+_VOLTAGE_RE = re.compile(r"realtime_voltage'\)\.innerText='([^']+)'")
+_CURRENT_RE = re.compile(r"realtime_current'\)\.innerText='([^']+)'")
+_ENERGY_RE = re.compile(r"电能\s+([\d\.]+)\s+KWH")
+
 
 class PduClient:
     """PDU HTTP 客户端"""
@@ -45,7 +50,6 @@ class PduClient:
         self.log_level = getattr(logging, log_level, logging.INFO)
         _LOGGER.setLevel(self.log_level)
 
-        self.session: Optional[aiohttp.ClientSession] = None
         self.remove_timer = None
         
         # Client mode only supports ONE PDU per instance
@@ -53,6 +57,22 @@ class PduClient:
         # Using host as ID ensures uniqueness per client instance
         self.pdu_id = self.host.replace(".", "_")
 
+        # 请求头中只有 Content-Length 随请求变化，其余部分预先编码
+        self._request_head = (
+            f"POST / HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8\r\n"
+            f"User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36\r\n"
+            f"Content-Type: application/x-www-form-urlencoded\r\n"
+        ).encode()
+        self._request_tail = (
+            f"Origin: http://{self.host}\r\n"
+            f"Referer: http://{self.host}/\r\n"
+            f"Cookie: cookie_username={self.username}; cookie_password={self.password}; save_cookie=1; cookie_is_mobile=1\r\n"
+            f"Connection: close\r\n"
+            f"\r\n"
+        ).encode()
+
     async def start(self):
         """启动 Client"""
         _LOGGER.info(f"启动 PDU Client {self.host}")
@@ -126,9 +146,12 @@ class PduClient:
         # We must use raw sockets to send the request and read the raw response.
         
         try:
-            reader, writer = await asyncio.open_connection(self.host, self.port)
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout=WEB_CONNECT_TIMEOUT
+            )
         except Exception as e:
-            _LOGGER.error(f"连接失败 {self.host}:{self.port}: {e}")
+            _LOGGER.error(f"连接失败 {self.host}:{self.port}: {e!r}")
+            await self.device_registry.async_set_device_connected(self.pdu_id, False)
             return None
 
         try:
@@ -138,25 +161,18 @@ class PduClient:
             # to be safe on the request side.
             
             # Build query string for body
-            body = urllib.parse.urlencode(data)
+            body = urllib.parse.urlencode(data).encode()
             
+            # 分段交给传输层一次写出，无需先拼接成完整请求
             request = (
-                f"POST / HTTP/1.1\r\n"
-                f"Host: {self.host}\r\n"
-                f"Accept: text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8\r\n"
-                f"User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36\r\n"
-                f"Content-Type: application/x-www-form-urlencoded\r\n"
-                f"Content-Length: {len(body)}\r\n"
-                f"Origin: http://{self.host}\r\n"
-                f"Referer: http://{self.host}/\r\n"
-                f"Cookie: cookie_username={self.username}; cookie_password={self.password}; save_cookie=1; cookie_is_mobile=1\r\n"
-                f"Connection: close\r\n"
-                f"\r\n"
-                f"{body}"
+                self._request_head,
+                b"Content-Length: %d\r\n" % len(body),
+                self._request_tail,
+                body,
             )
             
-            _LOGGER.debug(f"Sending raw request: {request}")
-            writer.write(request.encode())
+            _LOGGER.debug(f"Sending raw request body: {body}")
+            writer.writelines(request)
             await writer.drain()
             
             # Read response
@@ -195,7 +211,7 @@ class PduClient:
         if io_number <= 0:
             return
             
-        switch_index = int(math.log2(io_number)) + 1
+        switch_index = io_number.bit_length()
         
         # Node-RED uses td2_1 to td2_8 for buttons
         handcontrol_btn = f"td2_{switch_index}"
@@ -267,18 +283,21 @@ class PduClient:
         '0' -> ON, '1' -> OFF
         """
         # 匹配 var classtemp='000000011101111100000001 '.trim();
-        match = re.search(r"var\s+classtemp\s*=\s*'([^']+)'", text)
+        match = _CLASSTEMP_RE.search(text)
         if match:
             status_str = match.group(1).strip()
             _LOGGER.debug(f"解析到 classtemp 字符串: {status_str}")
             
-            # 取前8位进行循环
-            for i in range(8):
-                if i < len(status_str):
-                    char = status_str[i]
-                    # 取反逻辑：0 是开(on)，1 是关(off)
-                    state = "on" if char == '0' else "off"
-                    self.coordinator.update_switch_state(self.pdu_id, i + 1, state)
+            # 取前8位拼成 IO 位掩码，一次性更新所有开关
+            # 第 i 位字符对应第 i 个开关，故先反转再按二进制解析；
+            # 取反逻辑：0 是开(on)，1 是关(off)
+            bits = status_str[:8]
+            try:
+                io_value = int(bits[::-1], 2) ^ ((1 << len(bits)) - 1)
+            except ValueError:
+                _LOGGER.warning(f"无法解析 classtemp 字符串: {status_str}")
+                return
+            self.coordinator.update_all_switches(self.pdu_id, io_value)
             
             _LOGGER.debug(f"PDU {self.pdu_id} 开关状态更新完成")
         else:
@@ -290,16 +309,19 @@ class PduClient:
         # parent.document.getElementById('realtime_current').innerText='0.0 A              '.trim();
         # &nbsp;&nbsp;电能 0.4                KWH</b>
         
+        # 本次响应解析出的传感器数据，最后一次性提交给协调器
+        updates = {}
+
         # Regex needs to be flexible for quotes and whitespace
-        v_match = re.search(r"realtime_voltage'\)\.innerText='([^']+)'", text)
-        a_match = re.search(r"realtime_current'\)\.innerText='([^']+)'", text)
+        v_match = _VOLTAGE_RE.search(text)
+        a_match = _CURRENT_RE.search(text)
         
         if v_match:
             try:
                 # Remove unit and trim
                 v_str = v_match.group(1).replace('V', '').strip()
                 voltage = float(v_str)
-                self.coordinator.update_sensor_data(self.pdu_id, "voltage", voltage)
+                updates["voltage"] = voltage
             except ValueError:
                 pass
                 
@@ -307,13 +329,13 @@ class PduClient:
             try:
                 a_str = a_match.group(1).replace('A', '').strip()
                 current = float(a_str)
-                self.coordinator.update_sensor_data(self.pdu_id, "current", current)
+                updates["current"] = current
             except ValueError:
                 pass
                 
         # Energy
         # Matches: 电能 0.4                KWH
-        e_match = re.search(r"电能\s+([\d\.]+)\s+KWH", text)
+        e_match = _ENERGY_RE.search(text)
         if e_match:
             try:
                  energy = float(e_match.group(1))
@@ -323,7 +345,7 @@ class PduClient:
                  # Actually strictly speaking, sensor.py only defines power/current/voltage/temperature.
                  # Need to add SENSOR_TYPE_ENERGY support?
                  # For now, let's just update it in coordinator data.
-                 self.coordinator.update_sensor_data(self.pdu_id, "energy", energy)
+                 updates["energy"] = energy
             except ValueError:
                 pass
 
@@ -335,6 +357,8 @@ class PduClient:
                 v = float(v_match.group(1).replace('V', '').strip())
                 a = float(a_match.group(1).replace('A', '').strip())
                 power = round(v * a, 2)
-                self.coordinator.update_sensor_data(self.pdu_id, "power", power)
+                updates["power"] = power
             except:
                 pass
+
+        self.coordinator.update_sensor_batch(self.pdu_id, updates)
@@ -1,14 +1,13 @@
 """PDU TCP Server - 无 MQTT 版本"""
 import asyncio
+import functools
 import logging
-import aiohttp
+import random
 import re
-import math
-import urllib.parse
-from typing import Optional, Tuple, Set
+from typing import Optional, Set
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from datetime import timedelta
 
 from .coordinator import PduCoordinator
@@ -17,11 +16,55 @@ from .const import (
     DOMAIN, 
     CONF_FETCH_OUTLET_CURRENT, 
     CONF_WEB_USERNAME, 
-    CONF_WEB_PASSWORD
+    CONF_WEB_PASSWORD,
+    WEB_CONNECT_TIMEOUT,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# 控制命令发出后补发 iostate 查询的延时(秒)，状态变化集中在控制之后
+CONFIRM_POLL_DELAY = 0.5
+
+# 周期轮询时各 PDU 的请求在该时间窗口(秒)内错开发出，窗口需小于 5 秒的轮询周期
+POLL_SPREAD = 4.0
+
+# 分口电流抓取间隔(秒): 连续失败时指数退避至上限，成功后恢复
+OUTLET_FETCH_INTERVAL = 30
+OUTLET_FETCH_INTERVAL_MAX = 300
+OUTLET_FETCH_JITTER = 0.1
+
+# 预编译的正则表达式，避免每次解析时查找 re 模块缓存
+_CMD_RE = re.compile(r"(open|close).*?io='(\d+)'")
+# 分口电流页面直接在字节上匹配，无需整体解码
+# 一次匹配同时取出插座编号和引号内的第一个数值(引号内数值前后可有任意文字)
+_TD2_RE = re.compile(rb"td2_(\d+)'?\)\.innerText\s*=\s*'[^']*?([-+]?[0-9]*\.?[0-9]+)[^']*'")
+
+# iostate/PVC 帧是空格分隔的 key='value' 短文本，直接按 str 切分解析，无需正则
+_IO8_PREFIX = "io8='"
+_PVC_KEYS = frozenset("pvcae")
+_PVC_VALUE_CHARS = "0123456789."
+
+# 设备登录后总是创建的基础电参传感器
+_DEFAULT_SENSORS = frozenset({"power", "current", "voltage"})
+
+
+@functools.lru_cache(maxsize=64)
+def _build_frame(cmd_content: str) -> bytes:
+    """构造带校验码的完整命令帧
+
+    命令种类有限(iostate、PVC_get 及各路开关控制)，结果缓存后
+    周期命令无需重复计算校验码和编码。
+
+    Args:
+        cmd_content: 命令内容
+
+    Returns:
+        编码后的命令帧
+    """
+    # 校验码为命令字节和的低 8 位；命令均为 ASCII，求和在 C 层完成
+    check_value = sum(cmd_content.encode()) & 0xFF
+    return f"START {cmd_content} check='{check_value}' END".encode()
+
 
 class PduServer:
     """PDU TCP 服务器"""
@@ -64,16 +107,22 @@ class PduServer:
         self.log_level = getattr(logging, log_level, logging.INFO)
         _LOGGER.setLevel(self.log_level)
 
-        # 连接池: pdu_id -> (reader, writer)
+        # 连接池: pdu_id -> (reader, writer, 写锁)
+        # 写锁只防止同一连接上的并发写入交错，各设备之间互不阻塞
         self.connection_pool = {}
         self.server = None
         self.remove_timer = None
         
         # 新增：用于追踪后台任务，防止 Task destroyed 错误
         self._background_tasks = set()
-        
-        # 命令锁，防止并发写入冲突
-        self._cmd_lock = asyncio.Lock()
+
+        # 控制后的确认查询: pdu_id -> 取消回调
+        self._confirm_polls = {}
+
+        # 本实例已交给平台创建过的实体 unique_id，设备重连时不再重复创建
+        self._created_entities: Set[str] = set()
+        # pdu_id -> 上次检查过的可用传感器集合(协调器在集合变化时替换该对象)
+        self._seen_sensors = {}
 
     async def start(self):
         """启动 TCP Server"""
@@ -112,6 +161,9 @@ class PduServer:
         # 2. 停止定时器
         if self.remove_timer:
             self.remove_timer()
+        for cancel in self._confirm_polls.values():
+            cancel()
+        self._confirm_polls.clear()
 
         # 3. 关闭 TCP Server
         if self.server:
@@ -119,7 +171,7 @@ class PduServer:
             await self.server.wait_closed()
 
         # 4. 关闭所有客户端连接
-        for pdu_id, (reader, writer) in list(self.connection_pool.items()):
+        for pdu_id, (reader, writer, _) in list(self.connection_pool.items()):
             try:
                 writer.close()
                 await writer.wait_closed()
@@ -127,22 +179,27 @@ class PduServer:
                 pass
         self.connection_pool.clear()
         
-    def get_code(self, cmd_str: str) -> int:
-        """计算命令校验码"""
-        return sum(ord(ch) for ch in cmd_str) % 256
-
-    async def _send_raw_command(self, writer, cmd_content: str):
+    async def _send_raw_command(self, conn, cmd_content: str):
         """发送原始命令
         
         Args:
-            writer: 写入流
+            conn: 连接池条目 (reader, writer, 写锁)
             cmd_content: 命令内容
         """
-        check_value = self.get_code(cmd_content)
-        full_cmd = f"START {cmd_content} check='{check_value}' END"
+        await self._send_raw_commands(conn, (cmd_content,))
+
+    async def _send_raw_commands(self, conn, cmd_contents):
+        """一次写入、一次 drain 发送多条原始命令
+
+        Args:
+            conn: 连接池条目 (reader, writer, 写锁)
+            cmd_contents: 命令内容序列
+        """
+        _, writer, lock = conn
+        batch = b"".join(_build_frame(cmd) for cmd in cmd_contents)
         try:
-            async with self._cmd_lock:
-                writer.write(full_cmd.encode())
+            async with lock:
+                writer.write(batch)
                 await writer.drain()
         except Exception as e:
             _LOGGER.debug(f"发送命令失败: {e}")
@@ -155,41 +212,102 @@ class PduServer:
             action: 动作 "open" 或 "close"
             io_number: IO 编号(位掩码)
         """
-        if pdu_id not in self.connection_pool:
+        conn = self.connection_pool.get(pdu_id)
+        if conn is None:
             _LOGGER.warning(f"PDU {pdu_id} 未连接")
             return
 
-        _, writer = self.connection_pool[pdu_id]
+        _, writer, lock = conn
         if writer.is_closing():
             _LOGGER.error(f"PDU {pdu_id} 连接已关闭")
             return
 
-        cmd_content = f"{action} io='{io_number}'"
-        check_value = self.get_code(cmd_content)
-        full_cmd = f"START {cmd_content} check='{check_value}' END"
+        full_cmd = _build_frame(f"{action} io='{io_number}'")
 
         try:
-            async with self._cmd_lock:
-                writer.write(full_cmd.encode())
+            async with lock:
+                writer.write(full_cmd)
                 await writer.drain()
             _LOGGER.debug(f"发送到 {pdu_id}: {full_cmd}")
         except Exception as e:
             _LOGGER.error(f"发送命令错误: {e}")
+            return
+
+        self._schedule_confirm_poll(pdu_id)
+
+    def _schedule_confirm_poll(self, pdu_id: str):
+        """控制命令后尽快补发一次 iostate 查询，不必等待下一个 5 秒周期
+
+        短时间内的多次控制只合并为一次查询。
+
+        Args:
+            pdu_id: PDU 设备 ID
+        """
+        if pdu_id in self._confirm_polls:
+            return
+        self._confirm_polls[pdu_id] = async_call_later(
+            self.hass,
+            CONFIRM_POLL_DELAY,
+            functools.partial(self._async_confirm_poll, pdu_id),
+        )
+
+    async def _async_confirm_poll(self, pdu_id: str, _now):
+        """执行控制后的确认查询
+
+        Args:
+            pdu_id: PDU 设备 ID
+        """
+        self._confirm_polls.pop(pdu_id, None)
+        conn = self.connection_pool.get(pdu_id)
+        if conn is None or conn[1].is_closing():
+            return
+        await self._send_raw_command(conn, "iostate")
 
     async def _periodic_tasks(self, now):
-        """定期任务:请求 IO 状态和 PVC 数据"""
-        for pdu_id, (reader, writer) in list(self.connection_pool.items()):
-            if writer.is_closing():
-                continue
+        """定期任务:请求 IO 状态和 PVC 数据
 
-            # 请求 IO 状态
-            await self._send_raw_command(writer, "iostate")
-            
-            # 增加延时，防止命令粘连或设备处理不过来
-            await asyncio.sleep(0.5)
+        各 PDU 并发轮询，按序号在 POLL_SPREAD 窗口内均匀错开，
+        避免所有设备的请求和响应集中在同一时刻。
+        """
+        # 事件循环单线程，推导式中没有 await，遍历期间连接池不会被修改，无需先复制
+        conns = [
+            conn
+            for conn in self.connection_pool.values()
+            if not conn[1].is_closing()
+        ]
+        if not conns:
+            return
+
+        step = POLL_SPREAD / len(conns)
+        # 单个设备出错不影响其余设备的本轮轮询
+        results = await asyncio.gather(
+            *(self._poll_one(conn, idx * step) for idx, conn in enumerate(conns)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.debug(f"轮询 PDU 失败: {result!r}")
 
-            # 请求 PVC (功率、电压、电流)
-            await self._send_raw_command(writer, "PVC_get")
+    async def _poll_one(self, conn, offset: float):
+        """轮询单个 PDU
+
+        Args:
+            conn: 连接池条目 (reader, writer, 写锁)
+            offset: 本周期内的发送延时(秒)
+        """
+        if offset:
+            await asyncio.sleep(offset)
+        if conn[1].is_closing():
+            return
+
+        # 请求 IO 状态
+        await self._send_raw_command(conn, "iostate")
+        
+        # 增加延时，防止命令粘连或设备处理不过来
+        await asyncio.sleep(0.5)
+
+        # 请求 PVC (功率、电压、电流)
+        await self._send_raw_command(conn, "PVC_get")
 
     def _update_state_from_command(self, pdu_id: str, command: str):
         """从命令中更新状态
@@ -198,18 +316,20 @@ class PduServer:
             pdu_id: PDU 设备 ID
             command: 命令内容
         """
-        match = re.search(r"(open|close).*?io='(\d+)'", command)
+        match = _CMD_RE.search(command)
         if match:
             action, io_str = match.groups()
             io_number = int(io_str)
 
             # 转换 IO 编号为开关编号
-            if io_number <= 8:
+            if 0 < io_number <= 8:
                 ha_switch_number = io_number
-            elif (io_number & (io_number - 1)) == 0:  # 是 2 的幂
-                ha_switch_number = int(math.log2(io_number)) + 1
+            elif io_number and (io_number & (io_number - 1)) == 0:  # 是 2 的幂
+                ha_switch_number = io_number.bit_length()
             else:
-                ha_switch_number = io_number
+                # io 为 0 或不是单个位的掩码，无法对应到某个开关
+                _LOGGER.debug(f"PDU {pdu_id} 忽略无法识别的 io 值: {io_number}")
+                return
 
             state = "on" if action == "open" else "off"
             self.coordinator.update_switch_state(pdu_id, ha_switch_number, state)
@@ -221,10 +341,11 @@ class PduServer:
             pdu_id: PDU 设备 ID
             msg: 消息内容
         """
-        io_match = re.search(r"io8='(\d+)'", msg)
-        if io_match:
+        _, found, rest = msg.partition(_IO8_PREFIX)
+        io_str = rest.partition("'")[0]
+        if found and io_str.isdigit():
             try:
-                io_val = int(io_match.group(1))
+                io_val = int(io_str)
                 self.coordinator.update_all_switches(pdu_id, io_val)
             except Exception as e:
                 _LOGGER.error(f"解析 iostate 错误: {e}")
@@ -239,71 +360,83 @@ class PduServer:
         # 保持警告日志以便您确认
         _LOGGER.debug(f"[PVC_DEBUG] Raw msg: {msg}")
         
+        # 本帧解析出的传感器数据，最后一次性提交给协调器
+        updates = {}
+
+        # 单次切分提取所有字段: 基础字段取首次出现的合法值，c0-c7 为分路电流
+        fields = {}
+        outlet_currents = []
+        # 帧尾的 END 可能紧贴最后一个字段(如 c='4'END)，先去掉再切分
+        if msg.endswith("END"):
+            msg = msg[:-3]
+        for token in msg.split():
+            name, sep, raw = token.partition("='")
+            if not sep or not raw.endswith("'"):
+                continue
+            raw = raw[:-1]
+            key = name[:1].lower()
+            # 只接受 p/v/c/a/e(可带数字编号)的字段，如 check='..' 会被跳过
+            if key not in _PVC_KEYS or not raw:
+                continue
+            # e 允许小数，其余字段只接受无符号整数；
+            # 值不合法时跳过该字段，继续查找后面同名的字段
+            if key == "e":
+                if raw.strip(_PVC_VALUE_CHARS):
+                    continue
+            elif not raw.isdecimal():
+                continue
+            idx = name[1:]
+            if idx:
+                if key == "c" and idx.isdigit():
+                    outlet_currents.append((idx, raw))
+            elif key not in fields:
+                fields[key] = raw
+
+        # p/v/c/a 已在切分时校验为无符号整数，直接转换，无需 try/except
         # 1. 功率 (p/P)
-        p_match = re.search(r"[\s]([Pp])='(\d+)'", " " + msg) # Hack: prepend space to msg to simplify regex
-        if p_match:
-            try:
-                power = int(p_match.group(2))
-                self.coordinator.update_sensor_data(pdu_id, "power", power)
-            except Exception: pass
+        raw = fields.get("p")
+        if raw is not None:
+            updates["power"] = int(raw)
 
         # 2. 电压 (v/V) -> /100
-        v_match = re.search(r"[\s]([Vv])='(\d+)'", " " + msg)
-        if v_match:
-            try:
-                val = int(v_match.group(2))
-                voltage = round(val / 100.0, 2)
-                self.coordinator.update_sensor_data(pdu_id, "voltage", voltage)
-            except Exception: pass
+        raw = fields.get("v")
+        if raw is not None:
+            updates["voltage"] = round(int(raw) / 100.0, 2)
 
         # 3. 总电流
         # 优先寻找 c/C (Sec 2.3, scale /100)
-        c_match = re.search(r"[\s]([Cc])='(\d+)'", " " + msg)
         total_current_found = False
         
-        if c_match:
-            try:
-                val = int(c_match.group(2))
-                current = round(val / 100.0, 3) 
-                self.coordinator.update_sensor_data(pdu_id, "current", current)
-                total_current_found = True
-            except Exception: pass
+        raw = fields.get("c")
+        if raw is not None:
+            updates["current"] = round(int(raw) / 100.0, 3)
+            total_current_found = True
             
         # 如果没找到 c/C，尝试找 a/A (Sec 2.2, usually scale /1000 for Amps in other protocols, potentially /100 here?)
         # 安全起见，如果电压是 /100，假设 A 也是 /1000 比较常见，但文档没细说 A 的比例。
         # 鉴于 Sec 2.3 是"实时数据"，Sec 2.2 是"验证返回"，我们主要依赖 c。
         # 如果真出现了 A，我们先按 /1000 处理，如果不准(差10倍)用户会反馈。
-        if not total_current_found:
-            a_match = re.search(r"[\s]([Aa])='(\d+)'", " " + msg)
-            if a_match:
-                try:
-                    val = int(a_match.group(2))
-                    current = round(val / 100.0, 3) # 根据日志 A='121' 对应 1.21A
-                    self.coordinator.update_sensor_data(pdu_id, "current", current)
-                except Exception: pass
+        raw = fields.get("a")
+        if not total_current_found and raw is not None:
+            updates["current"] = round(int(raw) / 100.0, 3) # 根据日志 A='121' 对应 1.21A
 
         # 4. 电能 (e/E)
-        e_match = re.search(r"[\s]([Ee])='([\d\.]+)'", " " + msg)
-        if e_match:
+        if "e" in fields:
              try:
-                energy = float(e_match.group(2))
-                self.coordinator.update_sensor_data(pdu_id, "energy", energy)
+                energy = float(fields["e"])
+                updates["energy"] = energy
              except Exception: pass
 
         # 5. 分路电流 (c0 - c7) -> /100
         # 匹配 c0, C0, c1, C1 ...
-        c_matches = re.finditer(r"[\s]([Cc])(\d+)='(\d+)'", " " + msg)
-        for m in c_matches:
-            try:
-                # group(1) is 'c'/'C', group(2) is index '0', group(3) is value
-                idx = int(m.group(2)) # 0-7
-                val = int(m.group(3))
-                current_val = round(val / 100.0, 3)
-                
-                # 映射到 entity id (1-8)
-                switch_idx = idx + 1
-                self.coordinator.update_sensor_data(pdu_id, f"current_{switch_idx}", current_val)
-            except Exception: pass
+        # 编号与数值均已在切分时校验为数字
+        for idx_str, raw in outlet_currents:
+            # 映射到 entity id (1-8)
+            switch_idx = int(idx_str) + 1 # 0-7
+            updates[f"current_{switch_idx}"] = round(int(raw) / 100.0, 3)
+
+        self.coordinator.update_sensor_batch(pdu_id, updates)
+        self._create_new_sensor_entities(pdu_id)
 
 
     async def _fetch_outlet_currents(self, pdu_id: str, peer):
@@ -315,6 +448,7 @@ class PduServer:
         # 注意：这里保持最原始的请求格式，因为设备可能对 header 顺序或内容敏感
         # 且设备返回的数据不包含 HTTP 头，导致标准库无法解析
         data = "realtime_btn=8&radio_function=&select_temp=0&is_mobile=0"
+        # 请求内容在循环中不变，只编码一次
         req = (
             f"POST / HTTP/1.1\r\n"
             f"Host: {host_ip}\r\n"
@@ -323,56 +457,59 @@ class PduServer:
             f"Connection: close\r\n"
             f"\r\n"
             f"{data}"
-        )
+        ).encode("utf-8")
 
+        delay = OUTLET_FETCH_INTERVAL
         while True:
             try:
                 reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection(host_ip, port), timeout=10
+                    asyncio.open_connection(host_ip, port), timeout=WEB_CONNECT_TIMEOUT
                 )
                 
-                writer.write(req.encode("utf-8"))
+                writer.write(req)
                 await writer.drain()
                 
                 # 读取响应直到连接关闭 (EOF)
-                response_bytes = b""
+                response_bytes = bytearray()
                 try:
                     while True:
                         chunk = await asyncio.wait_for(reader.read(4096), timeout=10)
                         if not chunk:
                             break
-                        response_bytes += chunk
+                        response_bytes.extend(chunk)
                 except asyncio.TimeoutError:
                     pass # 读取超时也视为读取结束，尝试解析已有的数据
                 
                 writer.close()
                 await writer.wait_closed()
 
-                text = response_bytes.decode("utf-8", errors="ignore")
-                
                 # Debug (可选，如果不再需要可删除)
-                # _LOGGER.debug(f"[{pdu_id}] HTTP Response len: {len(text)}")
+                # _LOGGER.debug(f"[{pdu_id}] HTTP Response len: {len(response_bytes)}")
 
-                # 正则匹配
-                matches = list(re.finditer(r"td2_(\d+)'?\)\.innerText\s*=\s*'([^']*)'", text))
+                # 正则匹配 (页面中的目标字段均为 ASCII)
+                matches = list(_TD2_RE.finditer(response_bytes))
                 
                 if matches:
-                    for m in matches:
-                        idx = int(m.group(1))
-                        raw = m.group(2).strip()
-                        num = re.search(r"[-+]?[0-9]*\.?[0-9]+", raw)
-                        if num:
-                            val = round(float(num.group(0)), 3)
-                            self.coordinator.update_sensor_data(pdu_id, f"current_{idx}", val)
+                    self.coordinator.update_sensor_batch(
+                        pdu_id,
+                        {
+                            f"current_{int(m.group(1))}": round(float(m.group(2)), 3)
+                            for m in matches
+                        },
+                    )
+                    self._create_new_sensor_entities(pdu_id)
                 else:
                     _LOGGER.debug(f"[{pdu_id}] 未能从 HTTP 响应中匹配到电流数据")
+                delay = OUTLET_FETCH_INTERVAL
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                _LOGGER.debug(f"[{pdu_id}] 抓取电流失败: {e}")
+                delay = min(delay * 2, OUTLET_FETCH_INTERVAL_MAX)
+                _LOGGER.debug(f"[{pdu_id}] 抓取电流失败，{delay} 秒后重试: {e!r}")
             
-            await asyncio.sleep(30) # 30秒抓取一次
+            # 默认 30 秒抓取一次，加少量随机抖动避免多台设备同时请求
+            await asyncio.sleep(delay + random.uniform(0, delay * OUTLET_FETCH_JITTER))
 
     async def handle_client(self, reader, writer):
         """处理客户端连接
@@ -385,93 +522,19 @@ class PduServer:
         addr = writer.get_extra_info("peername")
         _LOGGER.debug(f"新连接来自 {addr}")
 
+        frames = self._iter_frames(reader)
         try:
-            buffer = ""
-
-            while True:
-                try:
-                    chunk = await asyncio.wait_for(reader.read(1024), timeout=60.0)
-                    if not chunk:
-                        break
-                    buffer += chunk.decode(errors="ignore")
-
-                    while "END" in buffer:
-                        start_pos = buffer.find("START")
-                        if start_pos == -1:
-                            # 没找到 START，但有 END，抛弃 END 及之前的内容
-                            buffer = buffer[buffer.find("END") + 3:]
-                            continue
-                        
-                        # 丢弃 START 之前的所有字符 (如 S\n)
-                        buffer = buffer[start_pos:]
-                        
-                        end_pos = buffer.find("END")
-                        if end_pos == -1:
-                            # START 有了，但 END 还没到，等待更多数据
-                            break
-                            
-                        msg = buffer[:end_pos + 3].strip()
-                        buffer = buffer[end_pos + 3:]
-
-                        if not pdu_id:
-                            # 登录阶段
-                            match = re.search(r"id='([^']+)'", msg)
-                            if match:
-                                pdu_id = match.group(1)
-                                
-                                # 注册设备(自动创建)
-                                await self.device_registry.async_register_device(pdu_id, auto_create=True)
-                                
-                                # 获取设备配置
-                                device_config = self.device_registry.get_device(pdu_id)
-                                num_switches = device_config.get("num_switches", 8)
-                                
-                                # 初始化协调器数据
-                                self.coordinator.init_pdu(pdu_id, num_switches)
-                                
-                                # 保存连接
-                                self.connection_pool[pdu_id] = (reader, writer)
-                                
-                                writer.write(b"Login Successful")
-                                await writer.drain()
-                                _LOGGER.info(f"PDU {pdu_id} 已从 {addr} 登录")
-
-                                # 初始请求
-                                await self._send_raw_command(writer, "iostate")
-                                await self._send_raw_command(writer, "PVC_get")
-                                
-                                # 触发实体创建(如果是新设备)
-                                await self._create_entities_for_device(pdu_id)
-                                
-                                # 启动分口电流抓取任务 (如果启用)
-                                if self.fetch_outlet_current:
-                                    _LOGGER.info(f"[{pdu_id}] 正在启动分口电流抓取任务 (目标: {addr[0]})")
-                                    task = asyncio.create_task(self._fetch_outlet_currents(pdu_id, addr))
-                                    self._background_tasks.add(task)
-                                    task.add_done_callback(self._background_tasks.discard)
-
-                            else:
-                                _LOGGER.warning(f"无效的登录尝试来自 {addr}: {msg}")
-                                return
-                        else:
-                            # 正常消息处理
-                            if re.search(r"\b(open|close)\s+io='(\d+)'", msg):
-                                content_match = re.search(r"START (.*) END", msg)
-                                if content_match:
-                                    self._update_state_from_command(pdu_id, content_match.group(1))
-                            elif "START iostate" in msg:
-                                self._parse_and_publish_iostate(pdu_id, msg)
-                            elif "START PVC" in msg:
-                                self._parse_and_publish_pvc(pdu_id, msg)
+            # 登录阶段只处理一次，之后进入不含登录分支的消息循环
+            pdu_id = await self._read_login(frames, addr)
+            if pdu_id:
+                await self._handle_login(pdu_id, reader, writer, addr)
+                await self._receive_loop(pdu_id, frames)
 
-                except asyncio.TimeoutError:
-                    # 超时,继续等待
-                    pass
-                except Exception as e:
-                    _LOGGER.error(f"客户端循环错误 {addr}: {e}")
-                    break
+        except Exception as e:
+            _LOGGER.error(f"客户端循环错误 {addr}: {e}")
 
         finally:
+            await frames.aclose()
             _LOGGER.info(f"连接关闭: {pdu_id} ({addr})")
             if pdu_id:
                 if pdu_id in self.connection_pool:
@@ -485,6 +548,113 @@ class PduServer:
             except Exception:
                 pass
 
+    async def _iter_frames(self, reader):
+        """逐条产出连接上收到的完整消息，连接关闭时结束
+
+        Args:
+            reader: 读取流
+
+        Yields:
+            以 START 开头、END 结尾的消息文本
+        """
+        while True:
+            # 由 StreamReader 在内部缓冲区中查找帧结束符
+            try:
+                frame = await asyncio.wait_for(reader.readuntil(b"END"), timeout=60.0)
+            except asyncio.TimeoutError:
+                # 超时,继续等待
+                continue
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError as e:
+                # 超长且无结束符的垃圾数据，丢弃后继续
+                await reader.readexactly(e.consumed)
+                continue
+
+            start_pos = frame.find(b"START")
+            if start_pos == -1:
+                # END 之前没有 START，抛弃 END 及之前的内容
+                continue
+
+            # 丢弃 START 之前的所有字符 (如 S\n)，只解码完整帧
+            yield frame[start_pos:].decode(errors="ignore").strip()
+
+    async def _read_login(self, frames, addr) -> Optional[str]:
+        """读取登录消息
+
+        Args:
+            frames: _iter_frames 产出的消息流
+            addr: 对端地址
+
+        Returns:
+            PDU 设备 ID，登录无效或连接关闭时返回 None
+        """
+        async for msg in frames:
+            _, found, rest = msg.partition("id='")
+            login_id, closed, _ = rest.partition("'")
+            if found and closed and login_id and login_id.isprintable():
+                return login_id
+            _LOGGER.warning(f"无效的登录尝试来自 {addr}: {msg}")
+            return None
+        return None
+
+    async def _handle_login(self, pdu_id: str, reader, writer, addr):
+        """登录成功后注册设备、保存连接并发起初始请求
+
+        Args:
+            pdu_id: PDU 设备 ID
+            reader: 读取流
+            writer: 写入流
+            addr: 对端地址
+        """
+        # 注册设备(自动创建)
+        await self.device_registry.async_register_device(pdu_id, auto_create=True)
+        
+        # 获取设备配置
+        device_config = self.device_registry.get_device(pdu_id)
+        num_switches = device_config.get("num_switches", 8)
+        
+        # 初始化协调器数据
+        self.coordinator.init_pdu(pdu_id, num_switches)
+        
+        # 保存连接
+        conn = (reader, writer, asyncio.Lock())
+        self.connection_pool[pdu_id] = conn
+        
+        writer.write(b"Login Successful")
+        await writer.drain()
+        _LOGGER.info(f"PDU {pdu_id} 已从 {addr} 登录")
+
+        # 初始请求
+        await self._send_raw_commands(conn, ("iostate", "PVC_get"))
+        
+        # 触发实体创建(如果是新设备)
+        await self._create_entities_for_device(pdu_id)
+        
+        # 启动分口电流抓取任务 (如果启用)
+        if self.fetch_outlet_current:
+            _LOGGER.info(f"[{pdu_id}] 正在启动分口电流抓取任务 (目标: {addr[0]})")
+            task = asyncio.create_task(self._fetch_outlet_currents(pdu_id, addr))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _receive_loop(self, pdu_id: str, frames):
+        """登录后的消息处理循环
+
+        Args:
+            pdu_id: PDU 设备 ID
+            frames: _iter_frames 产出的消息流
+        """
+        async for msg in frames:
+            # 正常消息处理: msg 以 START 开头、END 结尾，按前缀分类
+            if msg.startswith(("START open ", "START close ")):
+                # 去掉首尾的 "START " 和 "END"，由 _CMD_RE 提取操作数
+                self._update_state_from_command(pdu_id, msg[6:-3])
+            elif msg.startswith("START iostate"):
+                self._parse_and_publish_iostate(pdu_id, msg)
+            elif msg.startswith("START PVC"):
+                self._parse_and_publish_pvc(pdu_id, msg)
+
     async def _create_entities_for_device(self, pdu_id: str):
         """为新设备创建实体
         
@@ -501,13 +671,15 @@ class PduServer:
 
         # 动态导入以避免循环依赖
         from .switch import PduSwitch
-        from .sensor import PduSensor
         from .const import CONF_NUM_SWITCHES
 
         # 创建开关实体
         num_switches = device_config.get(CONF_NUM_SWITCHES, 8)
+        created = self._created_entities
         switch_entities = []
         for i in range(1, num_switches + 1):
+            if f"{pdu_id}_switch_{i}" in created:
+                continue
             switch_entities.append(
                 PduSwitch(
                     coordinator=self.coordinator,
@@ -520,22 +692,61 @@ class PduServer:
 
         if switch_entities and "add_switch_entities" in self.hass.data[DOMAIN].get(self.entry_id, {}):
             self.hass.data[DOMAIN][self.entry_id]["add_switch_entities"](switch_entities)
+            created.update(entity.unique_id for entity in switch_entities)
             _LOGGER.info(f"为 PDU {pdu_id} 创建了 {len(switch_entities)} 个开关实体")
 
         # 创建传感器实体(强制包含基础电参传感器)
-        default_sensors = {"power", "current", "voltage"}
-        
-        # 如果启用了分口电流抓取，预先添加对应的传感器
-        if self.fetch_outlet_current:
-             for i in range(1, 9):
-                 default_sensors.add(f"current_{i}")
+        # 分口电流等其他传感器在首次收到数据时再创建，见 _create_new_sensor_entities
+        # 如果有其他已发现的传感器也加上
+        self._add_sensor_entities(
+            pdu_id, _DEFAULT_SENSORS | self.coordinator.get_available_sensors(pdu_id)
+        )
+
+    def mark_entities_created(self, unique_ids):
+        """记录由平台初始化时创建的实体，设备登录时不再重复创建
+
+        Args:
+            unique_ids: 实体 unique_id 可迭代对象
+        """
+        self._created_entities.update(unique_ids)
+
+    def _create_new_sensor_entities(self, pdu_id: str):
+        """为首次出现数据的传感器类型创建实体
 
-        # 如果有其他动态发现的传感器也加上
+        Args:
+            pdu_id: PDU 设备 ID
+        """
         available_sensors = self.coordinator.get_available_sensors(pdu_id)
-        sensors_to_create = default_sensors.union(available_sensors)
-        
+        if self._seen_sensors.get(pdu_id) is available_sensors:
+            return
+        if self._add_sensor_entities(pdu_id, available_sensors):
+            self._seen_sensors[pdu_id] = available_sensors
+
+    def _add_sensor_entities(self, pdu_id: str, sensor_types) -> bool:
+        """创建尚未创建过的传感器实体
+
+        Args:
+            pdu_id: PDU 设备 ID
+            sensor_types: 传感器类型集合
+
+        Returns:
+            实体创建回调是否已就绪
+        """
+        add_entities = self.hass.data[DOMAIN].get(self.entry_id, {}).get("add_sensor_entities")
+        if add_entities is None:
+            return False
+
+        # 动态导入以避免循环依赖
+        from .sensor import PduSensor, SENSOR_CONFIGS
+
+        created = self._created_entities
         sensor_entities = []
-        for sensor_type in sensors_to_create:
+        for sensor_type in sensor_types:
+            if f"{pdu_id}_sensor_{sensor_type}" in created:
+                continue
+            # 与平台一致: 只创建已定义的类型或 current_N 分口电流
+            if sensor_type not in SENSOR_CONFIGS and not sensor_type.startswith("current_"):
+                continue
             sensor_entities.append(
                 PduSensor(
                     coordinator=self.coordinator,
@@ -545,6 +756,8 @@ class PduServer:
                 )
             )
 
-        if sensor_entities and "add_sensor_entities" in self.hass.data[DOMAIN].get(self.entry_id, {}):
-            self.hass.data[DOMAIN][self.entry_id]["add_sensor_entities"](sensor_entities)
+        if sensor_entities:
+            add_entities(sensor_entities)
+            created.update(entity.unique_id for entity in sensor_entities)
             _LOGGER.info(f"为 PDU {pdu_id} 创建了 {len(sensor_entities)} 个传感器实体")
+        return True
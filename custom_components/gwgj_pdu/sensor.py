@@ -1,4 +1,5 @@
 """PDU Sensor 平台"""
+import functools
 import logging
 from typing import Optional
 
@@ -22,6 +23,7 @@ from .const import (
     DOMAIN,
     DATA_COORDINATOR,
     DATA_DEVICE_REGISTRY,
+    DATA_SERVER,
     SENSOR_TYPE_POWER,
     SENSOR_TYPE_CURRENT,
     SENSOR_TYPE_VOLTAGE,
@@ -73,23 +75,50 @@ SENSOR_CONFIGS = {
     },
 }
 
+# 总是创建的基础传感器，以及启用分口电流时的 8 路插座电流传感器
+_DEFAULT_SENSOR_TYPES = frozenset({SENSOR_TYPE_POWER, SENSOR_TYPE_CURRENT, SENSOR_TYPE_VOLTAGE})
+_OUTLET_CURRENT_TYPES = frozenset(f"current_{i}" for i in range(1, 9))
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_sensor(sensor_type: str) -> tuple:
+    """解析传感器类型对应的实体属性，同类型的实体共用结果
+
+    Args:
+        sensor_type: 传感器类型
+
+    Returns:
+        (device_class, unit, state_class, icon, name)
+    """
+    if sensor_type.startswith("current_"):
+        # e.g. current_1 -> 插座 1 电流
+        config = SENSOR_CONFIGS[SENSOR_TYPE_CURRENT]
+        name = f"插座 {sensor_type.split('_')[1]} 电流"
+    else:
+        config = SENSOR_CONFIGS.get(sensor_type, {})
+        name = config.get("name", sensor_type)
+    return (
+        config.get("device_class"),
+        config.get("unit"),
+        config.get("state_class"),
+        config.get("icon"),
+        name,
+    )
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """设置 PDU Sensor 平台"""
     """设置 PDU Sensor 平台"""
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: PduCoordinator = data[DATA_COORDINATOR]
     device_registry: DeviceRegistry = data[DATA_DEVICE_REGISTRY]
 
-    # 为所有已注册的设备创建传感器实体
     # 注意:初始时可能没有传感器数据,实体会在接收到数据后动态创建
     # 获取 Server 实例以读取配置 (Server/Client)
     # Server 和 Client 实例都对外提供 fetch_outlet_current 属性 (Client 并没有, 需小心)
-    from .const import DATA_SERVER
     server = data.get(DATA_SERVER)
     
     fetch_outlet = False
@@ -98,34 +127,33 @@ async def async_setup_entry(
 
     # 为所有已注册的设备创建传感器实体
     entities = []
-    for pdu_id, device_config in device_registry.get_all_devices().items():
-        # 1. 基础传感器 (总是创建)
-        sensors_to_create = {"power", "current", "voltage"}
-        
-        # 2. 分口电流传感器 (如果配置启用)
-        if fetch_outlet:
-             for i in range(1, 9):
-                 sensors_to_create.add(f"current_{i}")
-                 
+    # 1. 基础传感器 (总是创建)
+    # 2. 分口电流传感器 (如果配置启用)
+    base_sensors = _DEFAULT_SENSOR_TYPES | _OUTLET_CURRENT_TYPES if fetch_outlet else _DEFAULT_SENSOR_TYPES
+
+    for pdu_id, _ in device_registry.iter_devices():
         # 3. 协调器中已知的其他传感器 (动态发现)
-        available_sensors = coordinator.get_available_sensors(pdu_id)
-        sensors_to_create = sensors_to_create.union(available_sensors)
-
-        for sensor_type in sensors_to_create:
-            # 允许 SENSOR_CONFIGS 中定义的类型，或者以 current_ 开头的动态类型
-            if sensor_type in SENSOR_CONFIGS or sensor_type.startswith("current_"):
-                entities.append(
-                    PduSensor(
-                        coordinator=coordinator,
-                        device_registry=device_registry,
-                        pdu_id=pdu_id,
-                        sensor_type=sensor_type,
-                    )
-                )
+        sensors_to_create = base_sensors | coordinator.get_available_sensors(pdu_id)
+
+        # 允许 SENSOR_CONFIGS 中定义的类型，或者以 current_ 开头的动态类型
+        entities.extend(
+            PduSensor(
+                coordinator=coordinator,
+                device_registry=device_registry,
+                pdu_id=pdu_id,
+                sensor_type=sensor_type,
+            )
+            for sensor_type in sensors_to_create
+            if sensor_type in SENSOR_CONFIGS or sensor_type.startswith("current_")
+        )
 
     if entities:
         async_add_entities(entities)
         _LOGGER.info(f"已添加 {len(entities)} 个 PDU 传感器实体")
+        # 告知 Server 这些实体已创建，设备登录时不再重复创建 (Client 没有该方法)
+        mark_created = getattr(server, "mark_entities_created", None)
+        if mark_created is not None:
+            mark_created(entity.unique_id for entity in entities)
 
     # 存储添加实体的回调,用于动态添加新传感器
     hass.data[DOMAIN][entry.entry_id]["add_sensor_entities"] = async_add_entities
@@ -154,65 +182,60 @@ class PduSensor(CoordinatorEntity, SensorEntity):
         self._pdu_id = pdu_id
         self._sensor_type = sensor_type
         self._attr_has_entity_name = True
+        self._attr_unique_id = f"{pdu_id}_sensor_{sensor_type}"
 
         # 从配置中获取传感器属性
-        base_type = sensor_type
-        if sensor_type.startswith("current_"):
-            base_type = SENSOR_TYPE_CURRENT
-        
-        config = SENSOR_CONFIGS.get(base_type, {})
-        self._attr_device_class = config.get("device_class")
-        self._attr_native_unit_of_measurement = config.get("unit")
-        self._attr_state_class = config.get("state_class")
-        self._attr_icon = config.get("icon")
-        
-        if sensor_type.startswith("current_"):
-            # e.g. current_1 -> 插座 1 电流
-            idx = sensor_type.split("_")[1]
-            self._sensor_name = f"插座 {idx} 电流"
-        else:
-            self._sensor_name = config.get("name", sensor_type)
-
-    @property
-    def unique_id(self) -> str:
-        """返回唯一 ID"""
-        return f"{self._pdu_id}_sensor_{self._sensor_type}"
-
-    @property
-    def name(self) -> str:
-        """返回实体名称"""
-        return self._sensor_name
-
-    @property
-    def device_info(self):
-        """返回设备信息"""
-        device_config = self._device_registry.get_device(self._pdu_id)
-        if not device_config:
-            return None
-
-        return {
-            "identifiers": {(DOMAIN, self._pdu_id)},
-            "name": device_config.get("name", f"PDU {self._pdu_id}"),
-            "manufacturer": device_config.get("manufacturer", "Generic"),
-            "model": device_config.get("model", "PDU"),
-            "sw_version": device_config.get("sw_version", "1.0.0"),
-            "configuration_url": device_config.get("configuration_url"),
-        }
+        (
+            self._attr_device_class,
+            self._attr_native_unit_of_measurement,
+            self._attr_state_class,
+            self._attr_icon,
+            self._attr_name,
+        ) = _resolve_sensor(sensor_type)
+
+        # 设备信息只在实体注册时读取，同一 PDU 的实体共用注册表中的同一份；
+        # 可用状态随协调器推送刷新，避免每次读取属性都查询设备注册表
+        self._attr_device_info = device_registry.get_device_info(pdu_id)
+        self._available = self._read_available()
+        # 当前数值随推送刷新，native_value 直接返回，也用于过滤未变化的推送
+        self._last_value: Optional[float] = coordinator.get_sensor_value(
+            pdu_id, sensor_type
+        )
 
     @property
     def native_value(self) -> Optional[float]:
         """返回传感器值"""
-        return self.coordinator.get_sensor_value(self._pdu_id, self._sensor_type)
+        return self._last_value
+
+    def _read_available(self) -> bool:
+        """从设备注册表读取可用状态"""
+        return self._pdu_id in self._device_registry.connected_pdus
 
     @property
     def available(self) -> bool:
         """返回实体是否可用"""
-        device_config = self._device_registry.get_device(self._pdu_id)
-        if not device_config:
-            return False
-        return device_config.get("connected", False)
+        return self._available
+
+    async def async_added_to_hass(self) -> None:
+        """注册到 Home Assistant 时订阅本 PDU 的数据推送"""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_pdu_listener(
+                self._pdu_id, self._handle_coordinator_update
+            )
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """处理协调器更新"""
+        """处理协调器更新
+
+        同一 PDU 的推送会通知其下所有传感器，只有本传感器的数值或
+        可用状态发生变化时才写入 HA 状态机。
+        """
+        value = self.coordinator.get_sensor_value(self._pdu_id, self._sensor_type)
+        available = self._read_available()
+        if value == self._last_value and available == self._available:
+            return
+        self._last_value = value
+        self._available = available
         self.async_write_ha_state()
@@ -26,7 +26,6 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """设置 PDU Switch 平台"""
     """设置 PDU Switch 平台"""
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: PduCoordinator = data[DATA_COORDINATOR]
@@ -35,7 +34,7 @@ async def async_setup_entry(
 
     # 为所有已注册的设备创建开关实体
     entities = []
-    for pdu_id, device_config in device_registry.get_all_devices().items():
+    for pdu_id, device_config in device_registry.iter_devices():
         num_switches = device_config.get(CONF_NUM_SWITCHES, 8)
         for i in range(1, num_switches + 1):
             entities.append(
@@ -51,8 +50,11 @@ async def async_setup_entry(
     if entities:
         async_add_entities(entities)
         _LOGGER.info(f"已添加 {len(entities)} 个 PDU 开关实体")
+        # 告知 Server 这些实体已创建，设备登录时不再重复创建 (Client 没有该方法)
+        mark_created = getattr(server, "mark_entities_created", None)
+        if mark_created is not None:
+            mark_created(entity.unique_id for entity in entities)
 
-    # 存储添加实体的回调,用于动态添加新设备
     # 存储添加实体的回调,用于动态添加新设备
     hass.data[DOMAIN][entry.entry_id]["add_switch_entities"] = async_add_entities
 
@@ -83,32 +85,15 @@ class PduSwitch(CoordinatorEntity, SwitchEntity):
         self._pdu_id = pdu_id
         self._switch_number = switch_number
         self._attr_has_entity_name = True
+        self._attr_unique_id = f"{pdu_id}_switch_{switch_number}"
+        self._attr_name = f"开关 {switch_number}"
+        # 控制命令中 io 字段的位掩码
+        self._io_value = 1 << (switch_number - 1)
 
-    @property
-    def unique_id(self) -> str:
-        """返回唯一 ID"""
-        return f"{self._pdu_id}_switch_{self._switch_number}"
-
-    @property
-    def name(self) -> str:
-        """返回实体名称"""
-        return f"开关 {self._switch_number}"
-
-    @property
-    def device_info(self):
-        """返回设备信息"""
-        device_config = self._device_registry.get_device(self._pdu_id)
-        if not device_config:
-            return None
-
-        return {
-            "identifiers": {(DOMAIN, self._pdu_id)},
-            "name": device_config.get("name", f"PDU {self._pdu_id}"),
-            "manufacturer": device_config.get("manufacturer", "Generic"),
-            "model": device_config.get("model", "PDU"),
-            "sw_version": device_config.get("sw_version", "1.0.0"),
-            "configuration_url": device_config.get("configuration_url"),
-        }
+        # 设备信息只在实体注册时读取，同一 PDU 的实体共用注册表中的同一份
+        self._attr_device_info = device_registry.get_device_info(pdu_id)
+        # 上次写入 HA 的开关状态与可用状态，用于过滤未变化的推送
+        self._last_state: Optional[tuple] = None
 
     @property
     def is_on(self) -> Optional[bool]:
@@ -121,32 +106,42 @@ class PduSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def available(self) -> bool:
         """返回实体是否可用"""
-        device_config = self._device_registry.get_device(self._pdu_id)
-        if not device_config:
-            return False
-        return device_config.get("connected", False)
+        return self._pdu_id in self._device_registry.connected_pdus
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """打开开关"""
-        io_value = 2 ** (self._switch_number - 1)
-        await self._server.send_control_command(self._pdu_id, "open", io_value)
-        
-        # 乐观更新状态
+        # 乐观更新状态，先于网络发送，界面无需等待命令写出
         self.coordinator.update_switch_state(
             self._pdu_id, self._switch_number, "on", debounce_sec=0
         )
+        await self._server.send_control_command(self._pdu_id, "open", self._io_value)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """关闭开关"""
-        io_value = 2 ** (self._switch_number - 1)
-        await self._server.send_control_command(self._pdu_id, "close", io_value)
-        
-        # 乐观更新状态
+        # 乐观更新状态，先于网络发送，界面无需等待命令写出
         self.coordinator.update_switch_state(
             self._pdu_id, self._switch_number, "off", debounce_sec=0
         )
+        await self._server.send_control_command(self._pdu_id, "close", self._io_value)
+
+    async def async_added_to_hass(self) -> None:
+        """注册到 Home Assistant 时订阅本 PDU 的数据推送"""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_pdu_listener(
+                self._pdu_id, self._handle_coordinator_update
+            )
+        )
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """处理协调器更新"""
+        """处理协调器更新
+
+        同一 PDU 的推送会通知其下所有开关，只有本开关的状态或
+        可用状态发生变化时才写入 HA 状态机。
+        """
+        state = (self.is_on, self.available)
+        if state == self._last_state:
+            return
+        self._last_state = state
         self.async_write_ha_state()